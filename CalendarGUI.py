@@ -1,40 +1,41 @@
-import pickle
+import startup_timing  # First import, so the startup clock includes everything after it
 import os
 from datetime import datetime, timedelta
 import pytz
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyperclip
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from PIL import Image, ImageTk
 import sys
-import random
-
-SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
-
-TIMEZONES = {
-    "Atlantic Standard Time": 'America/Halifax',
-    "Eastern Standard Time": 'America/New_York',
-    "Central Standard Time": 'America/Chicago',
-    "Mountain Standard Time": 'America/Denver',
-    "Pacific Standard Time": 'America/Los_Angeles',
-    "UTC": 'UTC',
-    # Add more time zones as needed
-}
+import hashlib
+from event_cache import SYNC_INTERVAL_SECONDS, get_event_cache
+import calendar_service
+import instrumentation
+from background_tasks import TaskRunner
+from slot_selection import SELECTORS, stable_seed
+from availability import (TIMEZONES, build_service, get_availability, get_common_free_slots, get_greeting_line,
+                          get_period_str, get_quorum_availability, invalidate_availability, iter_range_availability,
+                          parse_email_list, split_into_weeks)
+
+CHANGE_POLL_MS = SYNC_INTERVAL_SECONDS * 1000  # How often the shown availability is checked against the user's calendar
 
 # Global variables for GUI elements
 timezone_var = None
 duration_var = None
 recipient_entry = None
-second_email_entry = None
+participant_emails_entry = None
 merge_var = None
 text_widget = None
 email_entry = None
 email_entry_frame = None
 owner_name_entry = None
 user_email = None
+selector_var = None
+task_runner = None
+change_runner = None  # Separate runner, so background change polls don't drive the busy indicator
+progress_bar = None
+status_label = None
+last_request = None  # Reruns the last availability request with its inputs as submitted, for Refresh and change polls
+last_request_calendars = []
+shown_text = None  # The text the last request wrote, to tell whether the user has edited it since
 
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller."""
@@ -44,254 +45,295 @@ def get_resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-def get_token_path():
-    home_dir = os.path.expanduser("~")
-    token_dir = os.path.join(home_dir, ".calendar_app")
-    os.makedirs(token_dir, exist_ok=True)
-    return os.path.join(token_dir, "token.pickle")
-
-def parse_datetime(event_time):
-    if 'dateTime' in event_time:
-        return datetime.fromisoformat(event_time['dateTime'])  # Offset-aware
-    elif 'date' in event_time:
-        atlantic = pytz.timezone('America/Halifax')
-        return atlantic.localize(datetime.fromisoformat(event_time['date'] + 'T00:00:00'))
-    else:
-        raise ValueError("Invalid event time format")
-
-def is_ignored_event(event):
-    ignored_titles = ["Office", "Home"]
-    if 'summary' in event and event['summary'] in ignored_titles:
-        return True
-    return False
-
-def next_15_minute_increment(dt):
-    if dt.minute % 15 == 0 and dt.second == 0 and dt.microsecond == 0:
-        return dt
+def get_image_cache_dir():
+    # Under the home directory, since a frozen build's _MEIPASS is a fresh temp dir every run
+    cache_dir = os.path.join(calendar_service.get_app_dir(), "image_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def load_scaled_image(relative_path, size):
+    """Return a PhotoImage of the resource scaled to size, resizing with PIL only on a cache miss."""
+    source_path = get_resource_path(relative_path)
+    with open(source_path, 'rb') as source:
+        source_hash = hashlib.sha1(source.read()).hexdigest()
+    cached_path = os.path.join(get_image_cache_dir(), f"{source_hash}_{size[0]}x{size[1]}.png")
+
+    instrumentation.count("image_cache.hit" if os.path.exists(cached_path) else "image_cache.miss")
+    if not os.path.exists(cached_path):
+        from PIL import Image  # Only needed the first time an image/size pair is seen
+        image = Image.open(source_path).resize(size, Image.Resampling.LANCZOS)
+        temp_path = cached_path + ".tmp"
+        image.save(temp_path, format='PNG')
+        os.replace(temp_path, cached_path)
+
+    # Tk 8.6 decodes PNG itself, so cache hits never import PIL
+    return tk.PhotoImage(file=cached_path)
+
+def get_request_details():
+    """Read the names and participants off the form; returns None (after warning) if merge has no participants."""
+    # Get the recipient name and owner name from the main window
+    recipient_name = recipient_entry.get().strip()
+    if not recipient_name:
+        recipient_name = "there"
+
+    owner_name = owner_name_entry.get().strip()
+    if not owner_name:
+        owner_name = "my"  # Default to "my availability" if none provided
+
+    merge = (merge_var.get() == 1)
+
+    if merge:
+        # If merging, we need at least one other participant
+        participant_emails = parse_email_list(participant_emails_entry.get())
+        if not participant_emails:
+            messagebox.showwarning("Input Required", "Please enter at least one other participant's email address for merged availability.")
+            return None
+        calendar_ids = [user_email] + participant_emails
     else:
-        minutes = (dt.minute // 15) * 15 + 15
-        return dt.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
-
-def previous_15_minute_increment(dt):
-    minutes = (dt.minute // 15) * 15
-    return dt.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
-
-def get_open_slots(events, day_start, day_end):
-    open_slots = []
-    current_start = day_start
-    events.sort(key=lambda e: parse_datetime(e['start']))
-
-    for event in events:
-        if is_ignored_event(event):
-            continue
-        start = parse_datetime(event['start'])
-        end = parse_datetime(event['end'])
-        if start > current_start:
-            open_slots.append((current_start, start))
-        current_start = max(current_start, end)
-
-    if current_start < day_end:
-        open_slots.append((current_start, day_end))
-
-    return open_slots
-
-def get_events_from_calendar(calendar_id, time_min_iso, time_max_iso, service):
-    events_result = service.events().list(
-        calendarId=calendar_id,
-        timeMin=time_min_iso,
-        timeMax=time_max_iso,
-        singleEvents=True,
-        orderBy='startTime').execute()
-    return events_result.get('items', [])
-
-def build_service():
-    creds = None
-    credentials_path = get_resource_path('credentials.json')
-    token_path = get_token_path()
-
-    if os.path.exists(token_path):
-        with open(token_path, 'rb') as token:
-            creds = pickle.load(token)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
-
-    service = build('calendar', 'v3', credentials=creds)
-    return service
-
-def get_availability(calendar_id, week_offset=0, timezone_name='Atlantic Standard Time', duration_minutes=30):
-    service = build_service()
-    atlantic = pytz.timezone('America/Halifax')
-    target_timezone = pytz.timezone(TIMEZONES.get(timezone_name, 'America/Halifax'))
-    today = datetime.now(atlantic)
-    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=week_offset)
-    all_slots = []
-
-    for day_offset in range(5):  # Monday to Friday
-        current_day = monday + timedelta(days=day_offset)
-        time_min = datetime(current_day.year, current_day.month, current_day.day, 11, 0, tzinfo=atlantic)
-        time_max = datetime(current_day.year, current_day.month, current_day.day, 17, 0, tzinfo=atlantic)
-
-        time_min_iso = time_min.isoformat()
-        time_max_iso = time_max.isoformat()
-
-        events = get_events_from_calendar(calendar_id, time_min_iso, time_max_iso, service)
-        open_slots = get_open_slots(events, time_min, time_max)
-
-        for slot in open_slots:
-            slot_start = slot[0]
-            slot_end = slot[1]
-
-            aligned_start = next_15_minute_increment(slot_start)
-            aligned_end = previous_15_minute_increment(slot_end)
-
-            t = aligned_start
-            while t + timedelta(minutes=duration_minutes) <= slot_end:
-                all_slots.append((t, t + timedelta(minutes=duration_minutes)))
-                t += timedelta(minutes=15)
-
-    if len(all_slots) >= 5:
-        selected_slots = random.sample(all_slots, 5)
-    else:
-        selected_slots = all_slots
-
-    selected_slots.sort()
+        calendar_ids = [user_email]
 
-    availability = []
-    for slot in selected_slots:
-        slot_start_in_tz = slot[0].astimezone(target_timezone)
-        slot_end_in_tz = slot[1].astimezone(target_timezone)
-        day_str = slot_start_in_tz.strftime('%A, %B %d, %Y')
-        time_str = f"{slot_start_in_tz.strftime('%I:%M %p')} - {slot_end_in_tz.strftime('%I:%M %p')} {timezone_name}"
-        availability.append(f"{day_str}:\n{time_str}")
+    return recipient_name, owner_name, merge, calendar_ids
 
-    return availability
+def get_merge_engine():
+    # freebusy is quicker for many people but cannot ignore "Home"/"Office" markers by title
+    return 'freebusy' if freebusy_var.get() == 1 else 'events'
 
-def find_common_slots(slots1, slots2):
-    common_slots = []
-    i, j = 0, 0
+def remember_request(calendar_ids, run):
+    global last_request, last_request_calendars
+    last_request, last_request_calendars = run, calendar_ids
 
-    while i < len(slots1) and j < len(slots2):
-        start1, end1 = slots1[i]
-        start2, end2 = slots2[j]
+def mark_text_shown():
+    global shown_text
+    shown_text = text_widget.get(1.0, tk.END)
 
-        latest_start = max(start1, start2)
-        earliest_end = min(end1, end2)
+def show_availability(week_offset=0):
+    try:
+        selected_timezone = timezone_var.get()
+        selected_duration_str = duration_var.get()
+        selected_duration = 30 if "30" in selected_duration_str else 60
+        selector_name = selector_var.get()
 
-        if latest_start < earliest_end:
-            common_slots.append((latest_start, earliest_end))
+        details = get_request_details()
+        if details is None:
+            return
+        recipient_name, owner_name, merge, calendar_ids = details
 
-        if end1 < end2:
-            i += 1
+        engine = get_merge_engine() if merge else 'events'
+        selector = SELECTORS[selector_name](stable_seed(sorted(calendar_ids), week_offset, selected_duration))
+        if merge:
+            fetch = lambda report: get_common_free_slots(calendar_ids, week_offset, selected_timezone, selected_duration, engine,
+                                                         selector=selector, selection_key=(selector_name, week_offset))
         else:
-            j += 1
+            fetch = lambda report: get_availability(user_email, week_offset, selected_timezone, selected_duration,
+                                                    selector=selector, selection_key=(selector_name, week_offset))
 
-    return common_slots
+        period_str = get_period_str(week_offset)
+        greeting_line = get_greeting_line(recipient_name, owner_name, merge, period_str)
 
-def get_common_free_slots(calendar_id1, calendar_id2, week_offset=0, timezone_name='Atlantic Standard Time', duration_minutes=30):
-    service = build_service()
-    atlantic = pytz.timezone('America/Halifax')
-    target_timezone = pytz.timezone(TIMEZONES.get(timezone_name, 'America/Halifax'))
-    today = datetime.now(atlantic)
-    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=week_offset)
-    all_slots = []
+        def display_availability(availability):
+            availability_text = "\n\n".join(availability)
 
-    for day_offset in range(5):
-        current_day = monday + timedelta(days=day_offset)
-        time_min = datetime(current_day.year, current_day.month, current_day.day, 11, 0, tzinfo=atlantic)
-        time_max = datetime(current_day.year, current_day.month, current_day.day, 17, 0, tzinfo=atlantic)
+            with instrumentation.span("render.availability"):
+                text_widget.delete(1.0, tk.END)
+                text_widget.insert(tk.END, greeting_line + availability_text)
+                mark_text_shown()
 
-        time_min_iso = time_min.isoformat()
-        time_max_iso = time_max.isoformat()
+        def run(on_error=show_fetch_error):
+            # The fetch runs on a worker thread; clicking again with the same inputs joins it,
+            # different inputs replace it
+            fetch_key = (tuple(calendar_ids), week_offset, selected_timezone, selected_duration, selector_name, engine)
+            task_runner.submit('availability', fetch_key, fetch,
+                               on_done=display_availability, on_error=on_error, on_progress=show_progress)
 
-        events_person1 = get_events_from_calendar(calendar_id1, time_min_iso, time_max_iso, service)
-        events_person2 = get_events_from_calendar(calendar_id2, time_min_iso, time_max_iso, service)
+        remember_request(calendar_ids, run)
+        run()
 
-        open_slots_person1 = get_open_slots(events_person1, time_min, time_max)
-        open_slots_person2 = get_open_slots(events_person2, time_min, time_max)
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
-        common_slots = find_common_slots(open_slots_person1, open_slots_person2)
+def parse_date_range(from_text, to_text, weeks_text):
+    """Return (start_date, end_date) from the range fields.
 
-        for slot in common_slots:
-            slot_start = slot[0]
-            slot_end = slot[1]
+    "From" defaults to today; without a "To" date the range runs for the given number of weeks.
+    """
+    today = datetime.now(pytz.timezone('America/Halifax')).date()
+    start_date = datetime.strptime(from_text, '%Y-%m-%d').date() if from_text else today
+    if to_text:
+        end_date = datetime.strptime(to_text, '%Y-%m-%d').date()
+    else:
+        end_date = start_date + timedelta(weeks=int(weeks_text)) - timedelta(days=1)
+    if end_date < start_date:
+        raise ValueError("The end date is before the start date.")
+    return start_date, end_date
 
-            aligned_start = next_15_minute_increment(slot_start)
-            aligned_end = previous_15_minute_increment(slot_end)
+def show_range_availability():
+    try:
+        selected_timezone = timezone_var.get()
+        selected_duration_str = duration_var.get()
+        selected_duration = 30 if "30" in selected_duration_str else 60
+        selector_name = selector_var.get()
+
+        try:
+            start_date, end_date = parse_date_range(range_from_entry.get().strip(), range_to_entry.get().strip(), range_weeks_var.get())
+        except ValueError as e:
+            messagebox.showwarning("Invalid Range", f"Please enter dates as YYYY-MM-DD and a whole number of weeks. ({e})")
+            return
+
+        details = get_request_details()
+        if details is None:
+            return
+        recipient_name, owner_name, merge, calendar_ids = details
+
+        engine = get_merge_engine() if merge else 'events'
+        week_count = len(split_into_weeks(start_date, end_date))
+        period_str = f"{start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}"
+        greeting_line = get_greeting_line(recipient_name, owner_name, merge, period_str)
+
+        def fetch(report):
+            # Weeks arrive in order as they finish, so the first ones show while the rest load
+            for loaded, (week_start, availability) in enumerate(iter_range_availability(
+                    calendar_ids, start_date, end_date, selected_timezone, selected_duration, engine,
+                    selector=SELECTORS[selector_name](stable_seed(sorted(calendar_ids), start_date.isoformat(), selected_duration)),
+                    selection_key=(selector_name, start_date)), 1):
+                report((loaded, week_start, availability))
+            return week_count
+
+        def show_week(progress):
+            loaded, week_start, availability = progress
+            section = f"Week of {week_start.strftime('%A, %B %d, %Y')}:\n\n"
+            section += "\n\n".join(availability) if availability else "No open slots."
+            text_widget.insert(tk.END, section + "\n\n")
+            status_label.config(text=f"Loaded {loaded} of {week_count} weeks...")
+
+        def display_done(loaded):
+            status_label.config(text=f"Loaded {loaded} of {week_count} weeks.")
+            mark_text_shown()
+
+        def run(on_error=show_fetch_error):
+            fetch_key = (tuple(calendar_ids), start_date, end_date, selected_timezone, selected_duration, selector_name, engine)
+            if task_runner.is_running('availability', fetch_key):
+                return  # Already loading into the text box; a second listener would add every week twice
+
+            text_widget.delete(1.0, tk.END)
+            text_widget.insert(tk.END, greeting_line)
+            task_runner.submit('availability', fetch_key, fetch,
+                               on_done=display_done, on_error=on_error, on_progress=show_week)
+
+        remember_request(calendar_ids, run)
+        run()
 
-            t = aligned_start
-            while t + timedelta(minutes=duration_minutes) <= slot_end:
-                all_slots.append((t, t + timedelta(minutes=duration_minutes)))
-                t += timedelta(minutes=15)
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
-    if len(all_slots) >= 5:
-        selected_slots = random.sample(all_slots, 5)
-    else:
-        selected_slots = all_slots
+def refresh_availability():
+    """Force a sync of the last request's calendars, then rerun it with fresh data."""
+    if last_request is None:
+        invalidate_availability()
+        return
+    calendar_ids = list(dict.fromkeys(last_request_calendars))
 
-    selected_slots.sort()
+    def sync_calendars(report):
+        calendar_service.map_concurrently(
+            lambda calendar_id: get_event_cache().sync(calendar_id, build_service(), force=True), calendar_ids)
 
-    availability = []
-    for slot in selected_slots:
-        slot_start_in_tz = slot[0].astimezone(target_timezone)
-        slot_end_in_tz = slot[1].astimezone(target_timezone)
-        day_str = slot_start_in_tz.strftime('%A, %B %d, %Y')
-        time_str = f"{slot_start_in_tz.strftime('%I:%M %p')} - {slot_end_in_tz.strftime('%I:%M %p')} {timezone_name}"
-        availability.append(f"{day_str}:\n{time_str}")
+    def redo_last_request(_):
+        invalidate_availability()
+        last_request()
 
-    return availability
+    task_runner.submit('availability', ('refresh', tuple(calendar_ids)), sync_calendars,
+                       on_done=redo_last_request, on_error=show_fetch_error, on_progress=show_progress)
 
-def show_availability(week_offset=0):
+def show_quorum_availability():
     try:
         selected_timezone = timezone_var.get()
         selected_duration_str = duration_var.get()
         selected_duration = 30 if "30" in selected_duration_str else 60
 
-        # Get the recipient name and owner name from the main window
-        recipient_name = recipient_entry.get().strip()
-        if not recipient_name:
-            recipient_name = "there"
-        
-        owner_name = owner_name_entry.get().strip()
-        if not owner_name:
-            owner_name = "my"  # Default to "my availability" if none provided
+        try:
+            start_date, end_date = parse_date_range(range_from_entry.get().strip(), range_to_entry.get().strip(), range_weeks_var.get())
+        except ValueError as e:
+            messagebox.showwarning("Invalid Range", f"Please enter dates as YYYY-MM-DD and a whole number of weeks. ({e})")
+            return
+
+        details = get_request_details()
+        if details is None:
+            return
+        recipient_name, owner_name, merge, calendar_ids = details
+        calendar_ids = list(dict.fromkeys(calendar_ids))
+        if not merge:
+            messagebox.showwarning("Input Required", "Quorum search needs other participants: check Merge Availability and add their emails.")
+            return
+
+        try:
+            min_free = int(quorum_min_var.get())
+        except ValueError:
+            min_free = 0
+        if not 1 <= min_free <= len(calendar_ids):
+            messagebox.showwarning("Invalid Quorum", f"Please enter a number of free people from 1 to {len(calendar_ids)}.")
+            return
+        required = parse_email_list(quorum_required_entry.get())
+        unknown = [calendar_id for calendar_id in required if calendar_id not in calendar_ids]
+        if unknown:
+            messagebox.showwarning("Invalid Quorum", f"Required attendees must also be participants: {', '.join(unknown)}")
+            return
+
+        period_str = f"{start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}"
+        greeting_line = f"Hi {recipient_name}, here are times when at least {min_free} of {len(calendar_ids)} of us are free, {period_str}:\n\n"
+
+        def display_availability(availability):
+            with instrumentation.span("render.availability"):
+                text_widget.delete(1.0, tk.END)
+                text_widget.insert(tk.END, greeting_line + ("\n\n".join(availability) or "No times found."))
+                mark_text_shown()
+
+        engine = get_merge_engine()
+
+        def run(on_error=show_fetch_error):
+            fetch_key = ('quorum', tuple(calendar_ids), start_date, end_date, min_free, tuple(required), selected_timezone, selected_duration, engine)
+            task_runner.submit('availability', fetch_key,
+                               lambda report: get_quorum_availability(calendar_ids, start_date, end_date, min_free, required,
+                                                                      selected_timezone, selected_duration, engine),
+                               on_done=display_availability, on_error=on_error, on_progress=show_progress)
+
+        remember_request(calendar_ids, run)
+        run()
 
-        merge = (merge_var.get() == 1)
+    except Exception as e:
+        messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
-        if merge:
-            # If merging, we need the second email
-            calendar_id2 = second_email_entry.get().strip()
-            if not calendar_id2:
-                messagebox.showwarning("Input Required", "Please enter the second person's email address for merged availability.")
-                return
-            availability = get_common_free_slots(user_email, calendar_id2, week_offset, selected_timezone, selected_duration)
-        else:
-            availability = get_availability(user_email, week_offset, selected_timezone, selected_duration)
+def poll_calendar_changes():
+    """Sync the user's calendar in the background and quietly redo the shown request if any event changed."""
+    def sync_user_calendar(report):
+        return bool(get_event_cache().sync(user_email, build_service()))
 
-        period_str = "this week" if week_offset == 0 else "next week"
+    def redo_last_request(changed):
+        # Left alone while another request runs or once the user has edited the text
+        if (changed and last_request is not None and not task_runner.is_busy('availability')
+                and text_widget.get(1.0, tk.END) == shown_text):
+            last_request(on_error=lambda error: None)
 
-        if merge:
-            greeting_line = f"Hi {recipient_name}, here is our availability for {period_str}:\n\n"
-        else:
-            # Use the owner_name if provided, otherwise 'my'
-            greeting_line = f"Hi {recipient_name}, here is {owner_name}'s availability for {period_str}:\n\n"
+    if last_request is not None:
+        # Failures are left for the next poll or the next request to report
+        change_runner.submit('changes', user_email, sync_user_calendar, on_done=redo_last_request, on_error=lambda error: None)
+    root.after(CHANGE_POLL_MS, poll_calendar_changes)
 
-        availability_text = "\n\n".join(availability)
+def show_fetch_error(error):
+    messagebox.showerror("Error", f"An error occurred: {str(error)}")
 
-        text_widget.delete(1.0, tk.END)
-        text_widget.insert(tk.END, greeting_line + availability_text)
+def show_progress(message):
+    status_label.config(text=message)
 
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred: {str(e)}")
+def update_busy_indicator(busy):
+    if busy:
+        progress_bar.start(10)
+        status_label.config(text="Fetching availability...")
+    else:
+        progress_bar.stop()
+        status_label.config(text="")
 
 def copy_to_clipboard():
     availability_text = text_widget.get(1.0, tk.END)
+    import pyperclip
     pyperclip.copy(availability_text)
     messagebox.showinfo("Copied", "Availability copied to clipboard.")
 
@@ -303,9 +345,12 @@ def initialize_app():
         return
     email_entry_frame.destroy()
     display_main_gui()
+    calendar_service.warm_up()
 
 def display_main_gui():
-    global timezone_var, duration_var, recipient_entry, second_email_entry, merge_var, text_widget, owner_name_entry
+    global timezone_var, duration_var, recipient_entry, participant_emails_entry, merge_var, text_widget, owner_name_entry
+    global task_runner, change_runner, progress_bar, status_label, selector_var, freebusy_var
+    global range_from_entry, range_to_entry, range_weeks_var, quorum_min_var, quorum_required_entry
 
     main_frame = ttk.Frame(root, padding="20")
     main_frame.pack(fill=tk.BOTH, expand=True)
@@ -325,17 +370,23 @@ def display_main_gui():
     recipient_entry = ttk.Entry(main_frame, width=40)
     recipient_entry.pack(pady=5)
 
-    # Second person's email field (for merging)
-    second_email_label = ttk.Label(main_frame, text="Second Person's Email (for merge):")
-    second_email_label.pack(pady=5)
-    second_email_entry = ttk.Entry(main_frame, width=40)
-    second_email_entry.pack(pady=5)
+    # Other participants' emails field (for merging)
+    participant_emails_label = ttk.Label(main_frame, text="Other Participants' Emails (comma-separated, for merge):")
+    participant_emails_label.pack(pady=5)
+    participant_emails_entry = ttk.Entry(main_frame, width=40)
+    participant_emails_entry.pack(pady=5)
 
     # Checkbox for merge
     merge_var = tk.IntVar(value=0)
     merge_checkbox = ttk.Checkbutton(main_frame, text="Merge Availability", variable=merge_var)
     merge_checkbox.pack(pady=5)
 
+    # Opt-in: one free/busy query for everyone, but event titles are not visible to it
+    freebusy_var = tk.IntVar(value=0)
+    freebusy_checkbox = ttk.Checkbutton(main_frame, variable=freebusy_var,
+                                        text="Fast merge (free/busy only: Home/Office markers count as busy)")
+    freebusy_checkbox.pack(pady=5)
+
     # Time zone selection
     timezone_label = ttk.Label(main_frame, text="Select Time Zone:")
     timezone_label.pack(pady=5)
@@ -353,6 +404,14 @@ def display_main_gui():
     duration_combobox = ttk.Combobox(main_frame, textvariable=duration_var, values=duration_options, state='readonly')
     duration_combobox.pack(pady=5)
 
+    # How the suggested slots are picked
+    selector_label = ttk.Label(main_frame, text="Suggest Slots By:")
+    selector_label.pack(pady=5)
+    selector_var = tk.StringVar()
+    selector_var.set("Random")
+    selector_combobox = ttk.Combobox(main_frame, textvariable=selector_var, values=list(SELECTORS.keys()), state='readonly')
+    selector_combobox.pack(pady=5)
+
     buttons_frame = ttk.Frame(main_frame)
     buttons_frame.pack(pady=10)
 
@@ -362,10 +421,54 @@ def display_main_gui():
                                         command=lambda: show_availability(week_offset=1))
     fetch_this_week_button.grid(row=0, column=0, padx=5, pady=5)
     fetch_next_week_button.grid(row=0, column=1, padx=5, pady=5)
+    refresh_button = ttk.Button(buttons_frame, text="Refresh", command=refresh_availability)
+    refresh_button.grid(row=0, column=2, padx=5, pady=5)
+
+    # Any date range: "From" (default today) to "To", or "From" plus a number of weeks
+    range_frame = ttk.Frame(main_frame)
+    range_frame.pack(pady=(0, 10))
+    ttk.Label(range_frame, text="From (YYYY-MM-DD):").grid(row=0, column=0, padx=2)
+    range_from_entry = ttk.Entry(range_frame, width=11)
+    range_from_entry.grid(row=0, column=1, padx=2)
+    ttk.Label(range_frame, text="To:").grid(row=0, column=2, padx=2)
+    range_to_entry = ttk.Entry(range_frame, width=11)
+    range_to_entry.grid(row=0, column=3, padx=2)
+    ttk.Label(range_frame, text="or Weeks:").grid(row=0, column=4, padx=2)
+    range_weeks_var = tk.StringVar(value="4")
+    range_weeks_spinbox = ttk.Spinbox(range_frame, from_=1, to=52, width=4, textvariable=range_weeks_var)
+    range_weeks_spinbox.grid(row=0, column=5, padx=2)
+    fetch_range_button = ttk.Button(range_frame, text="Search Range", command=show_range_availability)
+    fetch_range_button.grid(row=0, column=6, padx=5)
+
+    # Over the same range: times when at least k of the participants are free, required ones ranked first
+    quorum_frame = ttk.Frame(main_frame)
+    quorum_frame.pack(pady=(0, 10))
+    ttk.Label(quorum_frame, text="At least").grid(row=0, column=0, padx=2)
+    quorum_min_var = tk.StringVar(value="2")
+    quorum_min_spinbox = ttk.Spinbox(quorum_frame, from_=1, to=100, width=4, textvariable=quorum_min_var)
+    quorum_min_spinbox.grid(row=0, column=1, padx=2)
+    ttk.Label(quorum_frame, text="free; Required:").grid(row=0, column=2, padx=2)
+    quorum_required_entry = ttk.Entry(quorum_frame, width=24)
+    quorum_required_entry.grid(row=0, column=3, padx=2)
+    fetch_quorum_button = ttk.Button(quorum_frame, text="Quorum Search", command=show_quorum_availability)
+    fetch_quorum_button.grid(row=0, column=4, padx=5)
+
+    # Progress indicator for fetches running in the background
+    progress_bar = ttk.Progressbar(main_frame, mode='indeterminate', length=200)
+    progress_bar.pack(pady=(0, 5))
+    status_label = ttk.Label(main_frame, text="")
+    status_label.pack()
+
+    task_runner = TaskRunner(root, on_busy_change=update_busy_indicator)
+    change_runner = TaskRunner(root, max_workers=1)
+    root.after(CHANGE_POLL_MS, poll_calendar_changes)
 
     copy_button = ttk.Button(main_frame, text="Copy to Clipboard", command=copy_to_clipboard)
     copy_button.pack(pady=10)
 
+    # Only shown when started with --diagnostics or --profile
+    instrumentation.add_diagnostics_button(root, main_frame)
+
     text_frame = ttk.Frame(main_frame)
     text_frame.pack(fill=tk.BOTH, expand=True)
 
@@ -378,12 +481,13 @@ def display_main_gui():
 
     # Store references globally
     globals()['recipient_entry'] = recipient_entry
-    globals()['second_email_entry'] = second_email_entry
+    globals()['participant_emails_entry'] = participant_emails_entry
     globals()['merge_var'] = merge_var
     globals()['owner_name_entry'] = owner_name_entry
 
 def create_gui():
     global root, email_entry_frame, email_entry
+    instrumentation.start_profiling("CalendarGUI")
     root = tk.Tk()
     root.title("Google Calendar Availability")
 
@@ -398,10 +502,7 @@ def create_gui():
     style = ttk.Style()
     style.theme_use('clam')
 
-    bg_image_path = get_resource_path("wallpaper.png")
-    bg_image = Image.open(bg_image_path)
-    bg_image = bg_image.resize((window_width, window_height), Image.Resampling.LANCZOS)
-    bg_image_tk = ImageTk.PhotoImage(bg_image)
+    bg_image_tk = load_scaled_image("wallpaper.png", (window_width, window_height))
 
     background_label = tk.Label(root, image=bg_image_tk)
     background_label.place(relwidth=1, relheight=1)
@@ -410,10 +511,7 @@ def create_gui():
     overlay_frame = tk.Frame(root, bg='white', bd=0, highlightthickness=0)
     overlay_frame.place(relx=0.5, rely=0.5, anchor='center')
 
-    logo_path = get_resource_path("logo.png")
-    logo_image = Image.open(logo_path)
-    logo_image = logo_image.resize((150, 150), Image.Resampling.LANCZOS)
-    logo_image_tk = ImageTk.PhotoImage(logo_image)
+    logo_image_tk = load_scaled_image("logo.png", (150, 150))
 
     logo_label = ttk.Label(overlay_frame, image=logo_image_tk)
     logo_label.pack(pady=10)
@@ -431,6 +529,7 @@ def create_gui():
     submit_button = ttk.Button(email_entry_frame, text="Submit", command=initialize_app)
     submit_button.pack(pady=10)
 
+    startup_timing.report_when_ready(root, "CalendarGUI")
     root.mainloop()
 
 if __name__ == "__main__":
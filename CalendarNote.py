@@ -1,94 +1,107 @@
-import pickle
-import os
+import startup_timing  # First import, so the startup clock includes everything after it
+import bisect
+import time
 from datetime import datetime, timedelta
 import pytz
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyperclip
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from PIL import Image, ImageTk
-import sys
-import csv
-from tkcalendar import Calendar
-
-SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+from event_cache import get_event_cache
+import calendar_service
+import instrumentation
+from background_tasks import TaskRunner
+from lru_cache import LRUCache
+from event_records import records_from_api
+from notes_store import get_notes_store
+from notes_export import ClipboardWriter, export_notes, export_to_file, get_export_filename, iter_export_rows
+
+AUTOSAVE_DELAY_MS = 800  # Typing pause before the notes window saves on its own
+NOTES_MARK = "\u2713"  # Shown in the event list next to events that have notes
+PREFETCH_DAYS = 3             # Days on each side of the shown day loaded in the background
+DAY_CACHE_SIZE = 93           # About three months of days
+DAY_CACHE_FRESH_SECONDS = 60  # Older days are still shown at once, then refreshed
 
 user_email = None
 chosen_date_global = None
+task_runner = None
+prefetch_runner = None  # Separate runner, so background prefetches don't drive the busy indicator
+day_cache = LRUCache(DAY_CACHE_SIZE)  # (calendar_id, date) -> (fetched_at, [EventRecord, ...])
 
-event_notes = {}    # event_id -> notes (string)
-event_details = {}  # event_id -> {'summary': str, 'start_time': datetime, 'attendees': [str,...]}
-
-def get_resource_path(relative_path):
-    """Get absolute path to resource, works for dev and for PyInstaller."""
-    try:
-        base_path = sys._MEIPASS
-    except AttributeError:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-def get_token_path():
-    home_dir = os.path.expanduser("~")
-    token_dir = os.path.join(home_dir, ".calendar_app")
-    os.makedirs(token_dir, exist_ok=True)
-    return os.path.join(token_dir, "token.pickle")
+event_details = {}  # event_id -> EventRecord
+rendered_rows = {}  # event_id -> values currently shown in events_tree, in display order
+displayed_date = None
 
 def build_service():
-    creds = None
-    credentials_path = get_resource_path('credentials.json')
-    token_path = get_token_path()
+    # Built once per process and shared with the other app; later calls return immediately
+    return calendar_service.get_service()
 
-    if os.path.exists(token_path):
-        with open(token_path, 'rb') as token:
-            creds = pickle.load(token)
+def get_events_for_dates(calendar_id, first_date, last_date):
+    """Return {date: [EventRecord, ...]} for every day from first_date to last_date, with one lookup for the range.
 
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
-
-    service = build('calendar', 'v3', credentials=creds)
-    return service
-
-def parse_event_time(time_obj):
-    if 'dateTime' in time_obj:
-        return datetime.fromisoformat(time_obj['dateTime'])
-    elif 'date' in time_obj:
-        # All-day event
-        return datetime.fromisoformat(time_obj['date'] + 'T00:00:00')
-    return None
-
-def get_events_for_date(calendar_id, chosen_date):
+    Each day lists the events overlapping it (an all-day event spanning two
+    days is on both), without "Home"/"Office" markers. Every day fetched is
+    also stored in day_cache.
+    """
     service = build_service()
     atlantic = pytz.timezone('America/Halifax')
-    chosen_date_local = atlantic.localize(chosen_date.replace(hour=0, minute=0, second=0, microsecond=0))
+    dates = [first_date + timedelta(days=offset) for offset in range((last_date - first_date).days + 1)]
+    day_starts = [atlantic.localize(datetime.combine(day, datetime.min.time())) for day in dates + [last_date + timedelta(days=1)]]
+
+    time_min_iso = day_starts[0].isoformat()
+    time_max_iso = day_starts[-1].isoformat()
+
+    events = get_event_cache().get_events(calendar_id, time_min_iso, time_max_iso, service)
+    if events is None:
+        # Outside the synced window, ask Google directly
+        events = []
+        for page in calendar_service.iter_event_pages(
+                service, calendar_service.NOTES_EVENT_FIELDS,
+                calendarId=calendar_id,
+                timeMin=time_min_iso,
+                timeMax=time_max_iso,
+                singleEvents=True,
+                orderBy='startTime'):
+            events.extend(records_from_api(page.get('items', [])))
+
+    bounds = [day_start.timestamp() for day_start in day_starts]
+    events_by_date = {day: [] for day in dates}
+    for event in events:
+        # Filter out "Home" or "Office"
+        if event.ignored:
+            continue
+        index = max(bisect.bisect_right(bounds, event.start) - 1, 0)
+        # Zero-length events still belong to the day they happen on
+        while index < len(dates) and bounds[index] < max(event.end, event.start + 1):
+            events_by_date[dates[index]].append(event)
+            index += 1
+
+    fetched_at = time.monotonic()
+    for day, day_events in events_by_date.items():
+        day_cache.put((calendar_id, day), (fetched_at, day_events))
+    return events_by_date
 
-    start_of_day = chosen_date_local
-    end_of_day = chosen_date_local + timedelta(days=1) - timedelta(microseconds=1)
-
-    time_min_iso = start_of_day.isoformat()
-    time_max_iso = end_of_day.isoformat()
-
-    events_result = service.events().list(
-        calendarId=calendar_id,
-        timeMin=time_min_iso,
-        timeMax=time_max_iso,
-        singleEvents=True,
-        orderBy='startTime'
-    ).execute()
-
-    events = events_result.get('items', [])
-    # Filter out "Home" or "Office"
-    filtered_events = [e for e in events if e.get('summary', '') not in ['Home', 'Office']]
-    return filtered_events
+def get_events_for_date(calendar_id, chosen_date):
+    day = chosen_date.date()
+    return get_events_for_dates(calendar_id, day, day)[day]
+
+def get_cached_events(calendar_id, day):
+    """Return (events, fresh) from day_cache, or (None, False) if the day has not been loaded."""
+    fetched_at, events = day_cache.get((calendar_id, day), (None, None))
+    if events is None:
+        return None, False
+    return events, time.monotonic() - fetched_at < DAY_CACHE_FRESH_SECONDS
+
+def prefetch_dates(calendar_id, first_date, last_date, on_done=None):
+    """Load the range into day_cache in the background, skipping it if every day is already fresh."""
+    days = [first_date + timedelta(days=offset) for offset in range((last_date - first_date).days + 1)]
+    if all(get_cached_events(calendar_id, day)[1] for day in days):
+        if on_done:
+            on_done(None)
+        return
+    prefetch_runner.submit('prefetch', (calendar_id, first_date, last_date),
+                           lambda report: get_events_for_dates(calendar_id, first_date, last_date),
+                           on_done=on_done, on_error=lambda error: None)  # A failed prefetch just means a fetch later
 
-def open_notes_window(event_id):
+def open_notes_window(event_id, event_date):
     notes_window = tk.Toplevel(root)
     notes_window.title("Edit Notes")
     notes_window.geometry("600x400")  # width x height
@@ -99,21 +112,51 @@ def open_notes_window(event_id):
     text_box = tk.Text(notes_window, wrap=tk.WORD, width=80, height=20)
     text_box.pack(pady=5, fill=tk.BOTH, expand=True)
 
-    existing_notes = event_notes.get(event_id, "")
+    record = event_details.get(event_id)  # Captured now: showing another day clears event_details
+    existing_notes = get_notes_store().get(event_id, event_date)
     if existing_notes:
         text_box.insert(tk.END, existing_notes)
+    saved_notes = [existing_notes]
 
-    def save_notes():
+    autosave_label = ttk.Label(notes_window, text="")
+    autosave_label.pack()
+    pending_autosave = [None]  # after() id of the scheduled autosave, if any
+
+    def persist():
+        # One small committed row per save, so a crash loses at most the last AUTOSAVE_DELAY_MS of typing
+        pending_autosave[0] = None
         new_notes = text_box.get("1.0", tk.END).strip()
-        event_notes[event_id] = new_notes
-        messagebox.showinfo("Notes Saved", "Your notes have been saved.")
+        if new_notes != saved_notes[0]:
+            get_notes_store().save(event_id, event_date, new_notes, record)
+            saved_notes[0] = new_notes
+            mark_event_notes(event_id, event_date, bool(new_notes))
+        autosave_label.config(text="All changes saved.")
+
+    def schedule_autosave(event=None):
+        if pending_autosave[0] is not None:
+            notes_window.after_cancel(pending_autosave[0])
+        pending_autosave[0] = notes_window.after(AUTOSAVE_DELAY_MS, persist)
+        autosave_label.config(text="Saving...")
+
+    def close_window():
+        if pending_autosave[0] is not None:
+            notes_window.after_cancel(pending_autosave[0])
+        persist()
         notes_window.destroy()
 
+    def save_notes():
+        close_window()
+        messagebox.showinfo("Notes Saved", "Your notes have been saved.")
+
+    text_box.bind('<KeyRelease>', schedule_autosave)
+    text_box.bind('<<Paste>>', schedule_autosave)
+    notes_window.protocol("WM_DELETE_WINDOW", close_window)
+
     save_button = ttk.Button(notes_window, text="Save Notes", command=save_notes)
     save_button.pack(pady=5)
 
-def event_button_click(event_id):
-    open_notes_window(event_id)
+def event_button_click(event_id, event_date):
+    open_notes_window(event_id, event_date)
 
 def show_events():
     if not user_email:
@@ -123,144 +166,282 @@ def show_events():
         messagebox.showwarning("Input Required", "Please select a date.")
         return
 
-    try:
-        events = get_events_for_date(user_email, chosen_date_global)
+    chosen_date = chosen_date_global
+    date_selected_label.config(text=f"Selected Date: {chosen_date.strftime('%A, %B %d, %Y')}")
 
-        for widget in events_frame.winfo_children():
-            widget.destroy()
+    # A prefetched day shows at once; a stale one is refreshed in place behind it
+    cached_events, fresh = get_cached_events(user_email, chosen_date.date())
+    if cached_events is not None:
+        display_events(cached_events, chosen_date)
+    if not fresh:
+        # Fetch on a worker thread; a repeat click for the same day joins the running fetch
+        task_runner.submit('events', (user_email, chosen_date), lambda report: get_events_for_date(user_email, chosen_date),
+                           on_done=lambda events: display_fetched_events(events, chosen_date), on_error=show_fetch_error)
 
-        if not events:
-            no_event_label = ttk.Label(events_frame, text=f"No events found on {chosen_date_global.strftime('%A, %B %d, %Y')}.")
-            no_event_label.pack(pady=10)
-            return
+    day = chosen_date.date()
+    prefetch_dates(user_email, day - timedelta(days=PREFETCH_DAYS), day + timedelta(days=PREFETCH_DAYS))
 
-        header_label = ttk.Label(events_frame, text=f"Events on {chosen_date_global.strftime('%A, %B %d, %Y')}:",
-                                 font=('Arial', 14, 'bold'))
-        header_label.pack(pady=(0, 10))
+def display_fetched_events(events, chosen_date):
+    # A cached day shown since the fetch started doesn't replace it, so the fetch may finish for a day no longer chosen
+    if chosen_date == chosen_date_global:
+        display_events(events, chosen_date)
 
-        event_details.clear()
+def show_adjacent_day(days):
+    global chosen_date_global
+    if not chosen_date_global:
+        messagebox.showwarning("Input Required", "Please select a date.")
+        return
+    chosen_date_global += timedelta(days=days)
+    show_events()
 
-        for event in events:
-            summary = event.get('summary', 'No Title')
-            start_time = parse_event_time(event.get('start', {}))
-            end_time = parse_event_time(event.get('end', {}))
-            attendees_list = event.get('attendees', [])
-            attendees_emails = [a.get('email', '') for a in attendees_list]
+def show_fetch_error(error):
+    messagebox.showerror("Error", f"An error occurred: {str(error)}")
 
-            start_str = start_time.strftime('%I:%M %p') if start_time else 'N/A'
-            end_str = end_time.strftime('%I:%M %p') if end_time else 'N/A'
+def update_busy_indicator(busy):
+    if busy:
+        progress_bar.start(10)
+        status_label.config(text="Fetching events...")
+    else:
+        progress_bar.stop()
+        status_label.config(text="")
+
+def display_events(events, chosen_date):
+    global displayed_date
+    try:
+        with instrumentation.span("render.events", events=len(events)):
+            date_str = chosen_date.strftime('%A, %B %d, %Y')
+            events_header_label.config(text=f"Events on {date_str}:" if events else f"No events found on {date_str}.")
 
-            event_id = event.get('id', None)
-            event_text = f"{summary} ({start_str} - {end_str})"
-            event_button = ttk.Button(events_frame, text=event_text, command=lambda eid=event_id: event_button_click(eid))
-            event_button.pack(pady=5, fill=tk.X)
+            event_details.clear()
+            # Saved notes for the day come back with it
+            displayed_date = chosen_date.date()
+            day_notes = get_notes_store().notes_for_date(displayed_date)
 
-            event_details[event_id] = {
-                'summary': summary,
-                'start_time': start_time,
-                'attendees': attendees_emails
-            }
+            rows = {}
+            for event in events:
+                rows[event.event_id] = get_event_row(event, event.event_id in day_notes)
+                event_details[event.event_id] = event
+            update_event_list(rows)
 
     except Exception as e:
         messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
+def get_event_row(event, has_notes):
+    start_str = event.start_datetime().strftime('%I:%M %p')
+    end_str = event.end_datetime().strftime('%I:%M %p')
+    return (f"{start_str} - {end_str}", event.summary or 'No Title', NOTES_MARK if has_notes else "")
+
+def update_event_list(rows):
+    """Make events_tree show rows ({event_id: values} in display order), changing only what differs.
+
+    The Treeview only draws the rows in view, and rows that are unchanged
+    since the last render cost a dict comparison, so re-showing or refreshing
+    a busy day does not rebuild anything.
+    """
+    if rows == rendered_rows and list(rows) == list(rendered_rows):
+        return
+
+    stale = [iid for iid in rendered_rows if iid not in rows]
+    if stale:
+        events_tree.delete(*stale)
+    for index, (iid, values) in enumerate(rows.items()):
+        if iid not in rendered_rows:
+            events_tree.insert('', index, iid=iid, values=values)
+        elif rendered_rows[iid] != values:
+            events_tree.item(iid, values=values)
+
+    if list(events_tree.get_children()) != list(rows):
+        # An event moved (rescheduled); put the rows back in start order
+        for index, iid in enumerate(rows):
+            events_tree.move(iid, '', index)
+
+    rendered_rows.clear()
+    rendered_rows.update(rows)
+
+def mark_event_notes(event_id, event_date, has_notes):
+    # Keep the notes column of the visible day in step with saves from a notes window
+    if event_date == displayed_date and event_id in rendered_rows:
+        values = rendered_rows[event_id][:2] + (NOTES_MARK if has_notes else "",)
+        rendered_rows[event_id] = values
+        events_tree.item(event_id, values=values)
+
+def open_selected_event(event=None):
+    event_id = events_tree.focus()
+    if event_id:
+        event_button_click(event_id, displayed_date)
+
+def build_event_list(parent):
+    """Create the header and scrolling Treeview the day's events are listed in."""
+    global events_header_label, events_tree
+    events_header_label = ttk.Label(parent, text="", font=('Arial', 14, 'bold'))
+    events_header_label.pack(pady=(0, 5))
+    ttk.Label(parent, text="Double-click an event to edit its notes.").pack(pady=(0, 5))
+
+    tree_frame = ttk.Frame(parent)
+    tree_frame.pack(fill=tk.BOTH, expand=True)
+    events_tree = ttk.Treeview(tree_frame, columns=('time', 'summary', 'notes'), show='headings', selectmode='browse')
+    events_tree.heading('time', text="Time")
+    events_tree.heading('summary', text="Event")
+    events_tree.heading('notes', text="Notes")
+    events_tree.column('time', width=150, stretch=False)
+    events_tree.column('summary', width=300)
+    events_tree.column('notes', width=60, stretch=False, anchor='center')
+    scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=events_tree.yview)
+    events_tree.configure(yscrollcommand=scrollbar.set)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    events_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    events_tree.bind('<Double-1>', open_selected_event)
+    events_tree.bind('<Return>', open_selected_event)
+    rendered_rows.clear()
+
+def get_export_range():
+    """Return (start_date, end_date) from the export fields; blank fields mean the chosen day."""
+    default_date = (chosen_date_global or datetime.now()).date()
+    from_text = export_from_entry.get().strip()
+    to_text = export_to_entry.get().strip()
+    start_date = datetime.strptime(from_text, '%Y-%m-%d').date() if from_text else default_date
+    end_date = datetime.strptime(to_text, '%Y-%m-%d').date() if to_text else start_date
+    if end_date < start_date:
+        raise ValueError("The end date is before the start date.")
+    return start_date, end_date
+
 def copy_to_clipboard():
-    if event_notes:
-        notes_str = "Current Event Notes\n\n"
-        for eid, notes in event_notes.items():
-            details = event_details.get(eid, {})
-            start_time = details.get('start_time', None)
-            summary = details.get('summary', '')
-            attendees = details.get('attendees', [])
-            start_str = start_time.strftime('%Y-%m-%d %H:%M') if start_time else 'N/A'
-            attendee_str = '; '.join(attendees)
-            notes_str += (f"Event Start Time: {start_str}\n"
-                          f"Event Name: {summary}\n"
-                          f"Attendees: {attendee_str}\n"
-                          f"Notes:\n{notes}\n\n"
-                          "--------------------------------------------\n\n")
-    else:
-        notes_str = "No notes available."
+    try:
+        start_date, end_date = get_export_range()
+    except ValueError as e:
+        messagebox.showwarning("Invalid Range", f"Please enter dates as YYYY-MM-DD. ({e})")
+        return
 
-    pyperclip.copy(notes_str)
-    messagebox.showinfo("Copied", "Current notes copied to clipboard.")
+    if not export_notes(iter_export_rows(start_date, end_date), ClipboardWriter()):
+        import pyperclip
+        pyperclip.copy("No notes available.")
+    messagebox.showinfo("Copied", "Notes copied to clipboard.")
 
-def save_notes_to_csv():
-    if not event_notes:
-        messagebox.showinfo("No Notes", "There are no notes to save.")
+def save_notes_to_file(file_format):
+    try:
+        start_date, end_date = get_export_range()
+    except ValueError as e:
+        messagebox.showwarning("Invalid Range", f"Please enter dates as YYYY-MM-DD. ({e})")
         return
 
-    if chosen_date_global:
-        date_str = chosen_date_global.strftime('%Y_%m_%d')
-    else:
-        date_str = datetime.now().strftime('%Y_%m_%d')  # fallback if no chosen_date_global
-
-    filename = f"event_notes_{date_str}.csv"
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Event Start Time", "Event Name", "Attendees", "Notes"])
-        for eid, notes in event_notes.items():
-            details = event_details.get(eid, {})
-            start_time = details.get('start_time', None)
-            summary = details.get('summary', '')
-            attendees = details.get('attendees', [])
-            start_str = start_time.strftime('%Y-%m-%d %H:%M') if start_time else 'N/A'
-            attendee_str = '; '.join(attendees)
-            writer.writerow([start_str, summary, attendee_str, notes])
-
-    messagebox.showinfo("Saved", f"Notes have been saved to {filename}.")
+    filename = get_export_filename(file_format, start_date, end_date)
+
+    def show_result(written):
+        if written:
+            messagebox.showinfo("Saved", f"Notes have been saved to {filename}.")
+        else:
+            messagebox.showinfo("No Notes", "There are no notes to save.")
+
+    # Rows stream from the notes store to the file on a worker thread
+    task_runner.submit('export', (file_format, start_date, end_date),
+                       lambda report: export_to_file(filename, file_format, start_date, end_date),
+                       on_done=show_result, on_error=show_fetch_error)
+
+def save_notes_to_csv():
+    save_notes_to_file("CSV")
 
 def save_notes_to_txt():
-    if not event_notes:
-        messagebox.showinfo("No Notes", "There are no notes to save.")
-        return
+    save_notes_to_file("TXT")
 
-    if chosen_date_global:
-        date_str = chosen_date_global.strftime('%Y_%m_%d')
-    else:
-        date_str = datetime.now().strftime('%Y_%m_%d')  # fallback if no chosen_date_global
-
-    filename = f"event_notes_{date_str}.txt"
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write("Event Notes\n\n")
-        for eid, notes in event_notes.items():
-            details = event_details.get(eid, {})
-            start_time = details.get('start_time', None)
-            summary = details.get('summary', '')
-            attendees = details.get('attendees', [])
-            start_str = start_time.strftime('%Y-%m-%d %H:%M') if start_time else 'N/A'
-            attendee_str = '; '.join(attendees)
-
-            f.write(f"Event Start Time: {start_str}\n")
-            f.write(f"Event Name: {summary}\n")
-            f.write(f"Attendees: {attendee_str}\n")
-            f.write("Notes:\n")
-            f.write(f"{notes}\n\n")
-            f.write("--------------------------------------------\n\n")
-
-    messagebox.showinfo("Saved", f"Notes have been saved to {filename}.")
+def save_notes_to_jsonl():
+    save_notes_to_file("JSONL")
+
+def search_notes(event=None):
+    """List the saved notes matching the search fields in a window; double-click one to edit it."""
+    text = search_entry.get().strip()
+    attendee = search_attendee_entry.get().strip()
+    if not text and not attendee:
+        messagebox.showwarning("Input Required", "Please enter words to search for or an attendee.")
+        return
+    with instrumentation.span("notes.search"):
+        hits = get_notes_store().search(text, attendee)
+
+    results_window = tk.Toplevel(root)
+    results_window.title("Search Notes")
+    results_window.geometry("700x400")
+    summary = f"{len(hits)} note{'s' if len(hits) != 1 else ''} found" if hits else "No notes found."
+    ttk.Label(results_window, text=summary).pack(pady=5)
+
+    tree_frame = ttk.Frame(results_window)
+    tree_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+    results_tree = ttk.Treeview(tree_frame, columns=('date', 'summary', 'match'), show='headings', selectmode='browse')
+    results_tree.heading('date', text="Date")
+    results_tree.heading('summary', text="Event")
+    results_tree.heading('match', text="Notes")
+    results_tree.column('date', width=90, stretch=False)
+    results_tree.column('summary', width=200)
+    results_tree.column('match', width=380)
+    scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=results_tree.yview)
+    results_tree.configure(yscrollcommand=scrollbar.set)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    rows_by_item = {}
+    for hit in hits:
+        item = results_tree.insert('', tk.END, values=(hit.row.event_date, hit.row.summary, hit.snippet.replace('\n', ' ')))
+        rows_by_item[item] = hit.row
+
+    def open_selected_result(event=None):
+        row = rows_by_item.get(results_tree.focus())
+        if row:
+            open_notes_window(row.event_id, datetime.strptime(row.event_date, '%Y-%m-%d').date())
+
+    results_tree.bind('<Double-1>', open_selected_result)
+    results_tree.bind('<Return>', open_selected_result)
+    ttk.Label(results_window, text="Double-click a note to edit it.").pack(pady=5)
 
 def pick_date():
+    from tkcalendar import Calendar  # Imported on first use to keep startup fast
+
     # Create a popup window to show the calendar
     date_window = tk.Toplevel(root)
     date_window.title("Select a Date")
     date_window.geometry("300x300")
 
-    cal = Calendar(date_window, selectmode='day', date_pattern='yyyy-mm-dd')
+    initial_date = (chosen_date_global or datetime.now()).date()
+    cal = Calendar(date_window, selectmode='day', date_pattern='yyyy-mm-dd',
+                   year=initial_date.year, month=initial_date.month, day=initial_date.day)
     cal.pack(pady=20)
+    cal.tag_config('has_events', background='#cfe2f3', foreground='black')
+
+    def mark_displayed_month(result=None):
+        # Days with events get highlighted from the prefetched data
+        if not cal.winfo_exists():
+            return
+        month, year = cal.get_displayed_month()
+        first_date, last_date = get_month_range(year, month)
+        cal.calevent_remove('all')
+        day = first_date
+        while day <= last_date:
+            events, _ = get_cached_events(user_email, day)
+            if events:
+                cal.calevent_create(day, f"{len(events)} events", 'has_events')
+            day += timedelta(days=1)
+
+    def prefetch_displayed_month(event=None):
+        mark_displayed_month()
+        month, year = cal.get_displayed_month()
+        prefetch_dates(user_email, *get_month_range(year, month), on_done=mark_displayed_month)
+
+    cal.bind('<<CalendarMonthChanged>>', prefetch_displayed_month)
+    prefetch_displayed_month()
 
     def confirm_date():
         global chosen_date_global
         selected_date_str = cal.get_date()  # returns 'YYYY-MM-DD'
         chosen_date_global = datetime.strptime(selected_date_str, '%Y-%m-%d')
         date_window.destroy()
-        # Update the date label on the main GUI
-        if date_selected_label:
-            date_selected_label.config(text=f"Selected Date: {chosen_date_global.strftime('%A, %B %d, %Y')}")
+        show_events()
 
     confirm_button = ttk.Button(date_window, text="Confirm Date", command=confirm_date)
     confirm_button.pack(pady=10)
 
+def get_month_range(year, month):
+    first_date = datetime(year, month, 1).date()
+    next_month = (first_date.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first_date, next_month - timedelta(days=1)
+
 def initialize_app():
     global user_email
     user_email = email_entry.get().strip()
@@ -269,9 +450,11 @@ def initialize_app():
         return
     email_entry_frame.destroy()
     display_main_gui()
+    calendar_service.warm_up()
 
 def display_main_gui():
-    global events_frame, date_selected_label
+    global events_frame, date_selected_label, task_runner, prefetch_runner, progress_bar, status_label
+    global export_from_entry, export_to_entry, search_entry, search_attendee_entry
 
     main_frame = ttk.Frame(root, padding="20")
     main_frame.pack(fill=tk.BOTH, expand=True)
@@ -285,27 +468,74 @@ def display_main_gui():
     pick_date_button = ttk.Button(main_frame, text="Open Calendar", command=pick_date)
     pick_date_button.pack(pady=5)
 
-    # Label to show the chosen date
-    date_selected_label = ttk.Label(main_frame, text="No date selected", font=('Arial', 12, 'italic'))
-    date_selected_label.pack(pady=5)
+    # The chosen date, between buttons that step a day back or forward
+    navigation_frame = ttk.Frame(main_frame)
+    navigation_frame.pack(pady=5)
+    previous_day_button = ttk.Button(navigation_frame, text="< Previous Day", command=lambda: show_adjacent_day(-1))
+    previous_day_button.grid(row=0, column=0, padx=5)
+    date_selected_label = ttk.Label(navigation_frame, text="No date selected", font=('Arial', 12, 'italic'))
+    date_selected_label.grid(row=0, column=1, padx=5)
+    next_day_button = ttk.Button(navigation_frame, text="Next Day >", command=lambda: show_adjacent_day(1))
+    next_day_button.grid(row=0, column=2, padx=5)
 
     fetch_button = ttk.Button(main_frame, text="Show Events", command=show_events)
     fetch_button.pack(pady=10)
 
+    # Progress indicator for fetches running in the background
+    progress_bar = ttk.Progressbar(main_frame, mode='indeterminate', length=200)
+    progress_bar.pack(pady=(0, 5))
+    status_label = ttk.Label(main_frame, text="")
+    status_label.pack()
+
+    task_runner = TaskRunner(root, on_busy_change=update_busy_indicator)
+    prefetch_runner = TaskRunner(root, max_workers=1)
+
+    # Exports cover the chosen day unless a range is given
+    export_frame = ttk.Frame(main_frame)
+    export_frame.pack(pady=5)
+    ttk.Label(export_frame, text="Export From (YYYY-MM-DD, blank: chosen day):").grid(row=0, column=0, padx=2)
+    export_from_entry = ttk.Entry(export_frame, width=11)
+    export_from_entry.grid(row=0, column=1, padx=2)
+    ttk.Label(export_frame, text="To:").grid(row=0, column=2, padx=2)
+    export_to_entry = ttk.Entry(export_frame, width=11)
+    export_to_entry.grid(row=0, column=3, padx=2)
+
     copy_button = ttk.Button(main_frame, text="Copy Notes to Clipboard", command=copy_to_clipboard)
     copy_button.pack(pady=5)
 
-    save_csv_button = ttk.Button(main_frame, text="Save All Notes to CSV", command=save_notes_to_csv)
+    save_csv_button = ttk.Button(main_frame, text="Save Notes to CSV", command=save_notes_to_csv)
     save_csv_button.pack(pady=5)
 
-    save_txt_button = ttk.Button(main_frame, text="Save All Notes to TXT", command=save_notes_to_txt)
+    save_txt_button = ttk.Button(main_frame, text="Save Notes to TXT", command=save_notes_to_txt)
     save_txt_button.pack(pady=5)
 
+    save_jsonl_button = ttk.Button(main_frame, text="Save Notes to JSONL", command=save_notes_to_jsonl)
+    save_jsonl_button.pack(pady=5)
+
+    # Search every saved note by its words, event title and attendees
+    search_frame = ttk.Frame(main_frame)
+    search_frame.pack(pady=5)
+    ttk.Label(search_frame, text="Search Notes:").grid(row=0, column=0, padx=2)
+    search_entry = ttk.Entry(search_frame, width=20)
+    search_entry.grid(row=0, column=1, padx=2)
+    ttk.Label(search_frame, text="Attendee:").grid(row=0, column=2, padx=2)
+    search_attendee_entry = ttk.Entry(search_frame, width=18)
+    search_attendee_entry.grid(row=0, column=3, padx=2)
+    search_button = ttk.Button(search_frame, text="Search", command=search_notes)
+    search_button.grid(row=0, column=4, padx=5)
+    search_entry.bind('<Return>', search_notes)
+    search_attendee_entry.bind('<Return>', search_notes)
+
+    # Only shown when started with --diagnostics or --profile
+    instrumentation.add_diagnostics_button(root, main_frame)
+
     events_frame = ttk.Frame(main_frame)
     events_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+    build_event_list(events_frame)
 
 def create_gui():
     global root, email_entry_frame, email_entry
+    instrumentation.start_profiling("CalendarNote")
     root = tk.Tk()
     root.title("Google Calendar Events Viewer")
 
@@ -335,6 +565,7 @@ def create_gui():
     submit_button = ttk.Button(email_entry_frame, text="Submit", command=initialize_app)
     submit_button.pack(pady=10)
 
+    startup_timing.report_when_ready(root, "CalendarNote")
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,560 @@
+"""Availability: fetching busy time, finding open slots and formatting the message.
+
+Kept free of Tk, so the headless server and batch tool can import it; the GUI
+in CalendarGUI is a front end over these functions.
+"""
+from datetime import datetime, timedelta
+import pytz
+import heapq
+import re
+from event_cache import add_change_listener, get_event_cache
+import calendar_service
+import instrumentation
+from event_records import records_from_api
+from working_hours import get_shared_window, get_working_window, get_working_hours
+from quorum import rank_quorum_slots
+from lru_cache import LRUCache
+from slot_selection import Slot, RandomSelector, SELECTORS, DEFAULT_SLOT_COUNT, stable_seed
+
+FREEBUSY_MAX_CALENDARS = 50  # freebusy.query rejects requests for more calendars than this
+
+# Memoized availability, so changing only the time zone or duration skips the fetch and the interval math,
+# kept per (calendar, day) so a changed event only recomputes the days it touched (see apply_event_changes)
+AVAILABILITY_TTL_SECONDS = 60  # As long as the event cache goes without an incremental sync
+busy_cache = LRUCache(512, AVAILABILITY_TTL_SECONDS)       # (engine, calendar_id, Monday) -> busy intervals or EventRecords
+day_open_cache = LRUCache(8192, AVAILABILITY_TTL_SECONDS)  # (engine, calendar_id, day_window) -> open slots
+selection_cache = LRUCache(256, AVAILABILITY_TTL_SECONDS)  # (open_slots key, duration, selection key) -> picked Slots
+MAX_INCREMENTAL_CHANGES = 50
+
+TIMEZONES = {
+    "Atlantic Standard Time": 'America/Halifax',
+    "Eastern Standard Time": 'America/New_York',
+    "Central Standard Time": 'America/Chicago',
+    "Mountain Standard Time": 'America/Denver',
+    "Pacific Standard Time": 'America/Los_Angeles',
+    "UTC": 'UTC',
+    # Add more time zones as needed
+}
+
+def parse_datetime(event_time):
+    if 'dateTime' in event_time:
+        return datetime.fromisoformat(event_time['dateTime'])  # Offset-aware
+    elif 'date' in event_time:
+        atlantic = pytz.timezone('America/Halifax')
+        return atlantic.localize(datetime.fromisoformat(event_time['date'] + 'T00:00:00'))
+    else:
+        raise ValueError("Invalid event time format")
+
+def next_15_minute_increment(dt):
+    if dt.minute % 15 == 0 and dt.second == 0 and dt.microsecond == 0:
+        return dt
+    else:
+        minutes = (dt.minute // 15) * 15 + 15
+        return dt.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
+
+def previous_15_minute_increment(dt):
+    minutes = (dt.minute // 15) * 15
+    return dt.replace(minute=0, second=0, microsecond=0) + timedelta(minutes=minutes)
+
+def get_open_slots(events, day_start, day_end):
+    # events are EventRecords, so this only compares epoch seconds
+    open_slots = []
+    timezone = day_start.tzinfo
+    day_start_ts = day_start.timestamp()
+    day_end_ts = day_end.timestamp()
+    current_start = day_start_ts
+
+    for event in sorted(events, key=lambda e: e.start):
+        if event.ignored:
+            continue
+        if event.start > current_start:
+            open_slots.append((current_start, event.start))
+        current_start = max(current_start, event.end)
+
+    if current_start < day_end_ts:
+        open_slots.append((current_start, day_end_ts))
+
+    return [(day_start if start == day_start_ts else datetime.fromtimestamp(start, timezone),
+             day_end if end == day_end_ts else datetime.fromtimestamp(end, timezone))
+            for start, end in open_slots]
+
+def get_events_from_calendar(calendar_id, time_min_iso, time_max_iso, service=None, use_cache=True):
+    service = service or build_service()
+    if use_cache:
+        events = get_event_cache().get_events(calendar_id, time_min_iso, time_max_iso, service)
+        if events is not None:
+            return events
+
+    events = []
+    for page in calendar_service.iter_event_pages(
+            service, calendar_service.AVAILABILITY_EVENT_FIELDS,
+            calendarId=calendar_id,
+            timeMin=time_min_iso,
+            timeMax=time_max_iso,
+            singleEvents=True,
+            orderBy='startTime'):
+        events.extend(records_from_api(page.get('items', [])))
+    return events
+
+def get_day_windows(start_date, end_date, calendar_ids=()):
+    """Return the shared working window of each day from start_date to end_date (inclusive) that has one."""
+    day_windows = []
+    day = start_date
+    while day <= end_date:
+        window = get_shared_window(calendar_ids, day)
+        if window:
+            day_windows.append(window)
+        day += timedelta(days=1)
+    return day_windows
+
+def get_week_start(week_offset=0):
+    atlantic = pytz.timezone('America/Halifax')
+    today = datetime.now(atlantic).date()
+    return today - timedelta(days=today.weekday()) + timedelta(weeks=week_offset)
+
+def get_week_windows(week_offset=0, calendar_ids=()):
+    """Return the (start, end) working window of each working day in the requested week."""
+    monday = get_week_start(week_offset)
+    return get_day_windows(monday, monday + timedelta(days=6), calendar_ids)
+
+def split_into_weeks(start_date, end_date):
+    # Monday-to-Sunday pieces of the range; the first and last may be partial weeks
+    weeks = []
+    week_start = start_date
+    while week_start <= end_date:
+        week_end = min(week_start + timedelta(days=6 - week_start.weekday()), end_date)
+        weeks.append((week_start, week_end))
+        week_start = week_end + timedelta(days=1)
+    return weeks
+
+def group_events_by_day(events, day_windows):
+    # An event lands in every window it overlaps, same as a per-day events().list would return it
+    buckets = [[] for _ in day_windows]
+    window_bounds = [(time_min.timestamp(), time_max.timestamp()) for time_min, time_max in day_windows]
+    for event in events:
+        for bucket, (time_min, time_max) in zip(buckets, window_bounds):
+            if event.start < time_max and event.end > time_min:
+                bucket.append(event)
+    return buckets
+
+def get_busy_intervals(calendar_ids, time_min_iso, time_max_iso, service=None, errors=None):
+    """Return {calendar_id: sorted busy intervals} from freebusy.query.
+
+    With an errors dict, calendars freebusy cannot read go there instead of raising.
+    """
+    chunks = [calendar_ids[i:i + FREEBUSY_MAX_CALENDARS] for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS)]
+    busy_by_calendar = {}
+    for chunk_busy in calendar_service.map_concurrently(
+            lambda chunk: query_busy_intervals(chunk, time_min_iso, time_max_iso, service, errors), chunks):
+        busy_by_calendar.update(chunk_busy)
+    return busy_by_calendar
+
+def query_busy_intervals(calendar_ids, time_min_iso, time_max_iso, service=None, errors=None):
+    # One freebusy.query for at most FREEBUSY_MAX_CALENDARS calendars
+    service = service or build_service()
+    body = {
+        'timeMin': time_min_iso,
+        'timeMax': time_max_iso,
+        'items': [{'id': calendar_id} for calendar_id in calendar_ids],
+    }
+    freebusy_result = instrumentation.execute(
+        service.freebusy().query(body=body, fields=calendar_service.FREEBUSY_FIELDS), 'freebusy.query')
+    calendars = freebusy_result.get('calendars', {})
+    busy_by_calendar = {}
+
+    for calendar_id in calendar_ids:
+        calendar = calendars.get(calendar_id, {})
+        if calendar.get('errors'):
+            reason = calendar['errors'][0].get('reason', 'unknown')
+            error = ValueError(f"Could not read free/busy information for {calendar_id}: {reason}")
+            if errors is None:
+                raise error
+            errors[calendar_id] = error
+            continue
+        busy_by_calendar[calendar_id] = sorted(
+            (parse_datetime({'dateTime': busy['start']}), parse_datetime({'dateTime': busy['end']}))
+            for busy in calendar.get('busy', []))
+
+    return busy_by_calendar
+
+def get_open_slots_from_busy(busy, day_start, day_end):
+    open_slots = []
+    current_start = day_start
+
+    for start, end in busy:
+        if end <= day_start or start >= day_end:
+            continue
+        if start > current_start:
+            open_slots.append((current_start, start))
+        current_start = max(current_start, end)
+
+    if current_start < day_end:
+        open_slots.append((current_start, day_end))
+
+    return open_slots
+
+def get_week_open_slots(calendar_ids, day_windows, service=None, engine='events'):
+    """Return {calendar_id: [open slots for each day window]}, computing only the days missing from day_open_cache.
+
+    'events' ignores "Home"/"Office" markers by title; 'freebusy' cannot see titles and treats transparent events as free.
+    """
+    if engine not in ('freebusy', 'events'):
+        raise ValueError(f"Unknown availability engine: {engine}")
+    open_slots_by_calendar = {calendar_id: [day_open_cache.get((engine, calendar_id, window)) for window in day_windows]
+                              for calendar_id in calendar_ids}
+    missing_days = {calendar_id: [index for index, open_slots in enumerate(open_slots_by_day) if open_slots is None]
+                    for calendar_id, open_slots_by_day in open_slots_by_calendar.items()}
+    missing_days = {calendar_id: indexes for calendar_id, indexes in missing_days.items() if indexes}
+    if not missing_days:
+        return open_slots_by_calendar
+
+    missing_windows = [day_windows[index] for index in sorted(set().union(*missing_days.values()))]
+    busy_by_calendar = get_week_busy(list(missing_days), missing_windows, service, engine)
+    for calendar_id, indexes in missing_days.items():
+        windows = [day_windows[index] for index in indexes]
+        busy = busy_by_calendar[calendar_id]
+        if engine == 'freebusy':
+            computed = [get_open_slots_from_busy(busy, time_min, time_max) for time_min, time_max in windows]
+        else:
+            computed = [get_open_slots(events, time_min, time_max)
+                        for (time_min, time_max), events in zip(windows, group_events_by_day(busy, windows))]
+        for index, window, open_slots in zip(indexes, windows, computed):
+            open_slots_by_calendar[calendar_id][index] = open_slots
+            day_open_cache.put((engine, calendar_id, window), open_slots)
+    return open_slots_by_calendar
+
+def get_week_busy(calendar_ids, day_windows, service, engine):
+    """Return {calendar_id: busy data covering day_windows}: freebusy intervals or EventRecords, from busy_cache where it can."""
+    week_starts = sorted({start.date() - timedelta(days=start.weekday()) for start, _ in day_windows})
+    busy_by_calendar = {calendar_id: [] for calendar_id in calendar_ids}
+    for week_start in week_starts:
+        week_busy = get_busy_for_week(calendar_ids, week_start, service, engine)
+        for calendar_id in calendar_ids:
+            busy_by_calendar[calendar_id].extend(week_busy[calendar_id])
+
+    if len(week_starts) > 1:
+        # Neighbouring weeks overlap by their padding day; both engines' open-slot math tolerates the repeats
+        for calendar_id, busy in busy_by_calendar.items():
+            busy.sort(key=(lambda interval: interval) if engine == 'freebusy' else (lambda event: event.start))
+    return busy_by_calendar
+
+def get_busy_for_week(calendar_ids, week_start, service, engine, errors=None):
+    """Return {calendar_id: busy data} for the week, fetching what busy_cache lacks in one go.
+
+    With an errors dict, calendars that cannot be read go there instead of failing the rest.
+    """
+    week_busy = {}
+    missing = []
+    for calendar_id in calendar_ids:
+        busy = busy_cache.get((engine, calendar_id, week_start))
+        if busy is None:
+            missing.append(calendar_id)
+        else:
+            week_busy[calendar_id] = busy
+    if missing:
+        fetched = fetch_week_busy(missing, week_start, service, engine, errors)
+        for calendar_id, busy in fetched.items():
+            busy_cache.put((engine, calendar_id, week_start), busy)
+        week_busy.update(fetched)
+    return week_busy
+
+def prefetch_busy(calendar_ids, week_starts, service=None, engine='events'):
+    """Fill busy_cache for every calendar and week, the weeks in parallel.
+
+    Returns {(calendar_id, week_start): error} for the calendars that could not be read.
+    """
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    errors = {}
+
+    def prefetch_week(week_start):
+        week_errors = {}
+        get_busy_for_week(calendar_ids, week_start, service, engine, week_errors)
+        errors.update(((calendar_id, week_start), error) for calendar_id, error in week_errors.items())
+
+    calendar_service.map_concurrently(prefetch_week, sorted(set(week_starts)))
+    return errors
+
+def fetch_week_busy(calendar_ids, week_start, service, engine, errors=None):
+    # A day of padding on each side covers working hours in any time zone
+    atlantic = pytz.timezone('America/Halifax')
+    time_min_iso = atlantic.localize(datetime.combine(week_start - timedelta(days=1), datetime.min.time())).isoformat()
+    time_max_iso = atlantic.localize(datetime.combine(week_start + timedelta(days=8), datetime.min.time())).isoformat()
+    if engine == 'freebusy':
+        return get_busy_intervals(calendar_ids, time_min_iso, time_max_iso, service, errors)
+
+    def fetch_events(calendar_id):
+        try:
+            return get_events_from_calendar(calendar_id, time_min_iso, time_max_iso, service)
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[calendar_id] = e
+            return None
+
+    all_events = calendar_service.map_concurrently(fetch_events, calendar_ids)
+    return {calendar_id: events for calendar_id, events in zip(calendar_ids, all_events) if events is not None}
+
+def invalidate_availability(calendar_id=None):
+    """Forget memoized availability for one calendar, or for all of them."""
+    if calendar_id is None:
+        busy_cache.clear()
+        day_open_cache.clear()
+        selection_cache.clear()
+        return
+    busy_cache.discard_where(lambda key: key[1] == calendar_id)
+    day_open_cache.discard_where(lambda key: key[1] == calendar_id)
+    selection_cache.discard_where(lambda key: calendar_id in key[0][1])
+
+def get_busy_week_starts(start_ts, end_ts):
+    """Return the Mondays whose busy_cache weeks (padded a day each side) include any of start_ts to end_ts."""
+    atlantic = pytz.timezone('America/Halifax')
+    first_day = datetime.fromtimestamp(start_ts, atlantic).date() - timedelta(days=1)
+    last_day = datetime.fromtimestamp(end_ts, atlantic).date() + timedelta(days=1)
+    monday = first_day - timedelta(days=first_day.weekday())
+    week_starts = []
+    while monday <= last_day:
+        week_starts.append(monday)
+        monday += timedelta(weeks=1)
+    return week_starts
+
+def apply_event_changes(calendar_id, changes):
+    """Patch memoized availability for a calendar's (old, new) EventRecord changes, dropping only the days they touch."""
+    if len(changes) > MAX_INCREMENTAL_CHANGES:
+        # A first fill or a big reload: checking every cached day against each change costs more than starting over
+        invalidate_availability(calendar_id)
+        return
+    changed_ranges = [(record.start, record.end) for pair in changes for record in pair if record is not None]
+    changed_ids = {record.event_id for pair in changes for record in pair if record is not None}
+    week_starts = sorted({monday for start_ts, end_ts in changed_ranges for monday in get_busy_week_starts(start_ts, end_ts)})
+    atlantic = pytz.timezone('America/Halifax')
+    for monday in week_starts:
+        busy_cache.pop(('freebusy', calendar_id, monday))
+        records = busy_cache.get(('events', calendar_id, monday))
+        if records is None:
+            continue
+        week_start_ts = atlantic.localize(datetime.combine(monday - timedelta(days=1), datetime.min.time())).timestamp()
+        week_end_ts = atlantic.localize(datetime.combine(monday + timedelta(days=8), datetime.min.time())).timestamp()
+        records = [record for record in records if record.event_id not in changed_ids]
+        records.extend(new for _, new in changes
+                       if new is not None and new.start < week_end_ts and new.end > week_start_ts)
+        records.sort(key=lambda event: event.start)
+        busy_cache.put(('events', calendar_id, monday), records)
+
+    def touches_change(window):
+        window_start_ts, window_end_ts = window[0].timestamp(), window[1].timestamp()
+        return any(start_ts < window_end_ts and end_ts > window_start_ts for start_ts, end_ts in changed_ranges)
+
+    day_open_cache.discard_where(lambda key: key[1] == calendar_id and touches_change(key[2]))
+    selection_cache.discard_where(lambda key: calendar_id in key[0][1] and any(touches_change(window) for window in key[0][2]))
+
+add_change_listener(apply_event_changes)
+
+def build_service():
+    # Built once per process and shared with the other app; later calls return immediately
+    return calendar_service.get_service()
+
+def get_availability(calendar_id, week_offset=0, timezone_name='Atlantic Standard Time', duration_minutes=30, service=None, selector=None, selection_key=None):
+    day_windows = get_week_windows(week_offset, [calendar_id])
+    if selector is None:
+        selector = get_default_selector([calendar_id], week_offset, duration_minutes)
+        selection_key = ('default', week_offset)
+    selected_slots = find_availability([calendar_id], day_windows, duration_minutes, 'events', service, selector, selection_key)
+    return format_availability(selected_slots, timezone_name)
+
+def format_availability(selected_slots, timezone_name):
+    target_timezone = pytz.timezone(TIMEZONES.get(timezone_name, 'America/Halifax'))
+    availability = []
+    for slot in selected_slots:
+        slot_start_in_tz = slot[0].astimezone(target_timezone)
+        slot_end_in_tz = slot[1].astimezone(target_timezone)
+        day_str = slot_start_in_tz.strftime('%A, %B %d, %Y')
+        time_str = f"{slot_start_in_tz.strftime('%I:%M %p')} - {slot_end_in_tz.strftime('%I:%M %p')} {timezone_name}"
+        availability.append(f"{day_str}:\n{time_str}")
+
+    return availability
+
+def find_common_slots(*slot_lists):
+    """Intersect any number of sorted open-slot lists in O(total slots * log k)."""
+    if not slot_lists or not all(slot_lists):
+        return []
+
+    # The heap holds each list's current slot keyed by its end; the latest start only ever grows
+    heap = [(slots[0][1], index, 0) for index, slots in enumerate(slot_lists)]
+    heapq.heapify(heap)
+    latest_start = max(slots[0][0] for slots in slot_lists)
+    common_slots = []
+
+    while True:
+        earliest_end, index, position = heap[0]
+        if latest_start < earliest_end:
+            common_slots.append((latest_start, earliest_end))
+
+        position += 1
+        slots = slot_lists[index]
+        if position == len(slots):
+            break
+        start, end = slots[position]
+        latest_start = max(latest_start, start)
+        heapq.heapreplace(heap, (end, index, position))
+
+    return common_slots
+
+def iter_slots(open_slots, duration_minutes):
+    """Yield every 15-minute-aligned Slot that leaves room for the whole meeting."""
+    duration = timedelta(minutes=duration_minutes)
+    for slot_start, slot_end in open_slots:
+        t = next_15_minute_increment(slot_start)
+        while t + duration <= slot_end:
+            yield Slot(t, t + duration,
+                       int((t - slot_start).total_seconds() // 60),
+                       int((slot_end - t - duration).total_seconds() // 60))
+            t += timedelta(minutes=15)
+
+def iter_candidate_slots(open_slots_by_calendar, day_windows, duration_minutes):
+    """Lazily yield every meeting Slot where all calendars are free, in time order."""
+    for day_index in range(len(day_windows)):
+        common_slots = find_common_slots(*(open_slots[day_index] for open_slots in open_slots_by_calendar.values()))
+        yield from iter_slots(common_slots, duration_minutes)
+
+def get_default_selector(calendar_ids, period, duration_minutes):
+    # Seeded from the request, so asking the same question twice suggests the same slots
+    return RandomSelector(DEFAULT_SLOT_COUNT, seed=stable_seed(sorted(calendar_ids), period, duration_minutes))
+
+def find_availability(calendar_ids, day_windows, duration_minutes, engine, service, selector, selection_key=None):
+    """Return the slots selector picks; with a selection_key naming the selector the picks are memoized too."""
+    if not day_windows:
+        return []
+    open_slots_by_calendar = get_week_open_slots(calendar_ids, day_windows, service, engine)
+    cache_key = None
+    if selection_key is not None:
+        cache_key = ((engine, tuple(calendar_ids), tuple(day_windows)), duration_minutes, selection_key)
+        selected_slots = selection_cache.get(cache_key)
+        if selected_slots is not None:
+            return selected_slots
+    selected_slots = selector.select(iter_candidate_slots(open_slots_by_calendar, day_windows, duration_minutes))
+    if cache_key is not None:
+        selection_cache.put(cache_key, selected_slots)
+    return selected_slots
+
+def get_common_free_slots(calendar_ids, week_offset=0, timezone_name='Atlantic Standard Time', duration_minutes=30, engine='events', service=None, selector=None, selection_key=None):
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    day_windows = get_week_windows(week_offset, calendar_ids)
+    if selector is None:
+        selector = get_default_selector(calendar_ids, week_offset, duration_minutes)
+        selection_key = ('default', week_offset)
+    selected_slots = find_availability(calendar_ids, day_windows, duration_minutes, engine, service, selector, selection_key)
+    return format_availability(selected_slots, timezone_name)
+
+def iter_range_availability(calendar_ids, start_date, end_date, timezone_name='Atlantic Standard Time', duration_minutes=30, engine='events', service=None, selector=None, selection_key=None):
+    """Yield (week_start, availability) for every week of the range, in order, as soon as each is ready."""
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    weeks = split_into_weeks(start_date, end_date)
+    if engine == 'events':
+        # The weeks run on the fetch pool, where each week's per-calendar fetches would run one after
+        # another, so the calendars are fetched first, in parallel (a calendar's later weeks come from its cache)
+        week_starts = sorted({first_day - timedelta(days=first_day.weekday()) for first_day, _ in weeks})
+        calendar_service.map_concurrently(
+            lambda calendar_id: [get_busy_for_week([calendar_id], week_start, service, engine) for week_start in week_starts],
+            calendar_ids)
+
+    def compute_week(week):
+        first_day, last_day = week
+        day_windows = get_day_windows(first_day, last_day, calendar_ids)
+        week_selector, week_selection_key = selector, selection_key
+        if selector is None:
+            week_selector = get_default_selector(calendar_ids, first_day.isoformat(), duration_minutes)
+            week_selection_key = ('default', first_day)
+        selected_slots = find_availability(calendar_ids, day_windows, duration_minutes, engine, service,
+                                           week_selector, week_selection_key)
+        return first_day, format_availability(selected_slots, timezone_name)
+
+    yield from calendar_service.iter_concurrently(compute_week, weeks)
+
+def get_greeting_line(recipient_name, owner_name, merge, period_str):
+    if merge:
+        return f"Hi {recipient_name}, here is our availability for {period_str}:\n\n"
+    # Use the owner_name if provided, otherwise 'my'
+    return f"Hi {recipient_name}, here is {owner_name}'s availability for {period_str}:\n\n"
+
+def get_period_str(week_offset):
+    if week_offset == 0:
+        return "this week"
+    if week_offset == 1:
+        return "next week"
+    return f"the week of {get_week_start(week_offset).strftime('%B %d, %Y')}"
+
+def get_availability_message(calendar_ids, week_offset, timezone_name, duration_minutes, selector_name,
+                             recipient_name, owner_name, engine='events', service=None):
+    """Build the message show_availability would, as a JSON-ready dict, for headless callers."""
+    merge = len(calendar_ids) > 1
+    if not merge:
+        engine = 'events'  # Like "This Week's Availability"
+    day_windows = get_week_windows(week_offset, calendar_ids)
+    selector = SELECTORS[selector_name](stable_seed(sorted(calendar_ids), week_offset, duration_minutes))
+    selected_slots = find_availability(calendar_ids, day_windows, duration_minutes, engine, service,
+                                       selector, (selector_name, week_offset))
+    availability = format_availability(selected_slots, timezone_name)
+    greeting = get_greeting_line(recipient_name, owner_name, merge, get_period_str(week_offset))
+    return {
+        'greeting': greeting,
+        'availability': availability,
+        'slots': [{'start': slot[0].isoformat(), 'end': slot[1].isoformat()} for slot in selected_slots],
+        'text': greeting + "\n\n".join(availability),
+    }
+
+def get_range_availability(calendar_ids, start_date, end_date, **kwargs):
+    """Return [(week_start, availability), ...] for the range; see iter_range_availability."""
+    return list(iter_range_availability(calendar_ids, start_date, end_date, **kwargs))
+
+def get_quorum_day_windows(start_date, end_date, calendar_ids):
+    """Return [(date, window)] for each day anyone works, the window running from the
+    earliest working start to the latest working end among calendar_ids."""
+    local_timezone = pytz.timezone(get_working_hours(calendar_ids[0])['timezone'])
+    day_windows = []
+    day = start_date
+    while day <= end_date:
+        windows = [window for window in (get_working_window(calendar_id, day) for calendar_id in calendar_ids) if window]
+        if windows:
+            day_windows.append((day, (min(window[0] for window in windows).astimezone(local_timezone),
+                                      max(window[1] for window in windows).astimezone(local_timezone))))
+        day += timedelta(days=1)
+    return day_windows
+
+def clip_open_slots(open_slots, window):
+    if window is None:
+        return []
+    return [(max(start, window[0]), min(end, window[1])) for start, end in open_slots
+            if start < window[1] and end > window[0]]
+
+def find_quorum_slots(calendar_ids, start_date, end_date, duration_minutes, min_free, required=(), engine='events', service=None, count=DEFAULT_SLOT_COUNT):
+    """Return the best QuorumSlots in the range where at least min_free calendars are free within their own working hours."""
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    days_and_windows = get_quorum_day_windows(start_date, end_date, calendar_ids)
+    if not days_and_windows:
+        return []
+    days = [day for day, _ in days_and_windows]
+    day_windows = [window for _, window in days_and_windows]
+    open_slots_by_calendar = get_week_open_slots(calendar_ids, day_windows, service, engine)
+    working_slots_by_calendar = {
+        calendar_id: [clip_open_slots(open_slots, get_working_window(calendar_id, day))
+                      for open_slots, day in zip(open_slots_by_calendar[calendar_id], days)]
+        for calendar_id in calendar_ids}
+    return rank_quorum_slots(working_slots_by_calendar, day_windows, duration_minutes, min_free, required, count)
+
+def format_quorum_availability(quorum_slots, timezone_name):
+    availability = []
+    for slot, line in zip(quorum_slots, format_availability(quorum_slots, timezone_name)):
+        total = len(slot.free) + len(slot.missing)
+        line += f"\n{len(slot.free)} of {total} free"
+        if slot.missing:
+            line += f" (not free: {', '.join(slot.missing)})"
+        availability.append(line)
+    return availability
+
+def get_quorum_availability(calendar_ids, start_date, end_date, min_free, required=(), timezone_name='Atlantic Standard Time', duration_minutes=30, engine='events', service=None, count=DEFAULT_SLOT_COUNT):
+    quorum_slots = find_quorum_slots(calendar_ids, start_date, end_date, duration_minutes, min_free, required, engine, service, count)
+    return format_quorum_availability(quorum_slots, timezone_name)
+
+def parse_email_list(text):
+    # Accept addresses separated by commas, semicolons, whitespace or newlines
+    return [email for email in re.split(r'[,;\s]+', text) if email]
@@ -0,0 +1,244 @@
+"""Headless HTTP/JSON server for the availability module.
+
+    python availability_server.py                   # http://127.0.0.1:8765
+    python availability_server.py --host 0.0.0.0 --port 9000 --workers 16
+
+One process answers every coordinator instead of each running the Tk app
+and repeating the same fetches: the event cache, the memoized busy data and
+open slots, and the authorized Calendar clients (one per worker thread) are
+shared by all requests, and identical requests that arrive together are
+answered by a single computation.
+
+    GET  /availability?calendar=me@example.com&calendar=them@example.com&week=0
+         &timezone=Atlantic+Standard+Time&duration=30&selector=Random&recipient=Sam&owner=Alex
+    POST /availability  {"calendars": [...], "week": 0, "timezone": ..., ...}
+
+Only calendars is required. One calendar is answered like "This Week's
+Availability", several like a merged request. Both read the events and
+ignore "Home"/"Office" markers by title; engine=freebusy opts merged
+requests into one free/busy query instead, which cannot see titles.
+The response holds the greeting and the formatted slots exactly as the app
+shows them, plus the slots as ISO timestamps:
+
+    {"greeting": "...", "availability": ["Monday, ...:\\n11:00 AM - ..."],
+     "slots": [{"start": "...", "end": "..."}], "text": "..."}
+
+GET /health answers "ok"; GET /stats reports cache sizes and, with
+--diagnostics, the instrumentation summary.
+"""
+import argparse
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import calendar_service
+import instrumentation
+import availability
+from slot_selection import SELECTORS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+MAX_BODY_BYTES = 64 * 1024
+MAX_CALENDARS = availability.FREEBUSY_MAX_CALENDARS
+MAX_WEEK_OFFSET = 52
+DURATIONS = (15, 30, 45, 60, 90, 120)
+ENGINES = ('events', 'freebusy')
+KEEP_ALIVE_SECONDS = 30  # Idle connections are closed after this long
+
+
+def parse_availability_request(fields):
+    """Validate request fields (a dict of lists, as parse_qs returns) into keyword arguments for
+    availability.get_availability_message.
+
+    Raises ValueError with a message for the client when a field is missing or invalid.
+    """
+    def first(name, default):
+        values = fields.get(name)
+        return values[0] if values else default
+
+    calendar_ids = []
+    for value in fields.get('calendar', []) + fields.get('calendars', []):
+        calendar_ids.extend(availability.parse_email_list(value))
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    if not calendar_ids:
+        raise ValueError("At least one calendar is required.")
+    if len(calendar_ids) > MAX_CALENDARS:
+        raise ValueError(f"At most {MAX_CALENDARS} calendars can be merged.")
+
+    try:
+        week_offset = int(first('week', 0))
+        duration_minutes = int(first('duration', 30))
+    except ValueError:
+        raise ValueError("week and duration must be whole numbers.") from None
+    if not 0 <= week_offset <= MAX_WEEK_OFFSET:
+        raise ValueError(f"week must be from 0 to {MAX_WEEK_OFFSET}.")
+    if duration_minutes not in DURATIONS:
+        raise ValueError(f"duration must be one of {', '.join(map(str, DURATIONS))} minutes.")
+
+    timezone_name = first('timezone', 'Atlantic Standard Time')
+    if timezone_name not in availability.TIMEZONES:
+        raise ValueError(f"timezone must be one of: {', '.join(availability.TIMEZONES)}.")
+    selector_name = first('selector', 'Random')
+    if selector_name not in SELECTORS:
+        raise ValueError(f"selector must be one of: {', '.join(SELECTORS)}.")
+    engine = first('engine', 'events')
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of: {', '.join(ENGINES)}.")
+
+    return {
+        'calendar_ids': calendar_ids,
+        'week_offset': week_offset,
+        'timezone_name': timezone_name,
+        'duration_minutes': duration_minutes,
+        'selector_name': selector_name,
+        'recipient_name': first('recipient', '').strip() or "there",
+        'owner_name': first('owner', '').strip() or "my",
+        'engine': engine if len(calendar_ids) > 1 else 'events',
+    }
+
+
+class AvailabilityServer(ThreadingHTTPServer):
+    """An HTTP server that computes responses on a fixed pool of worker threads.
+
+    Each connection gets a lightweight thread for its socket, so idle
+    keep-alive clients cost nothing, while the work itself is bounded by the pool.
+
+    service is passed to every computation; leave it None to give each worker
+    thread its own authorized client, or pass a thread-safe stand-in (the load
+    test passes a FakeCalendarService).
+    """
+    daemon_threads = True
+
+    def __init__(self, address, service=None, workers=DEFAULT_WORKERS):
+        super().__init__(address, AvailabilityRequestHandler)
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="server-worker")
+        self._in_flight = {}  # request key -> Future of the response being computed
+        self._in_flight_lock = threading.Lock()
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+    def get_response(self, request):
+        """Compute the response for request (parsed fields), sharing one computation between identical requests."""
+        key = json.dumps(request, sort_keys=True)
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            instrumentation.count("server.coalesced")
+            return future.result()
+        try:
+            future.set_result(self.executor.submit(availability.get_availability_message, service=self.service, **request).result())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def get_stats(self):
+        stats = {
+            'busy_cache': len(availability.busy_cache),
+            'day_open_cache': len(availability.day_open_cache),
+            'selection_cache': len(availability.selection_cache),
+        }
+        if instrumentation.ENABLED:
+            stats['diagnostics'] = instrumentation.summary()
+        return stats
+
+
+class AvailabilityRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so a client's requests reuse its connection
+    server_version = 'AvailabilityServer/1.0'
+    timeout = KEEP_ALIVE_SECONDS
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes; don't hold the body for an ACK
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        elif url.path == '/stats':
+            self.send_json(200, self.server.get_stats())
+        elif url.path == '/availability':
+            self.answer(parse_qs(url.query))
+        else:
+            self.send_json(404, {'error': f"Unknown path: {url.path}"})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/availability':
+            self.send_json(404, {'error': f"Unknown path: {self.path}"})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_json(413, {'error': "Request body is too large."})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(body, dict):
+                raise ValueError
+        except ValueError:
+            self.send_json(400, {'error': "The body must be a JSON object."})
+            return
+        # Same shape as a query string: every field a list of strings
+        fields = {name: [str(item) for item in value] if isinstance(value, list) else [str(value)]
+                  for name, value in body.items()}
+        self.answer(fields)
+
+    def answer(self, fields):
+        try:
+            request = parse_availability_request(fields)
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        try:
+            with instrumentation.span("server.availability", calendars=len(request['calendar_ids'])):
+                response = self.server.get_response(request)
+        except ValueError as e:
+            # Raised for calendars freebusy can't read
+            self.send_json(422, {'error': str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {'error': f"An error occurred: {e}"})
+            return
+        self.send_json(200, response)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per request is noise under load; --diagnostics has the timings
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Responses computed at once")
+    parser.add_argument('--diagnostics', action='store_true', help="Record timings (read by instrumentation)")
+    args = parser.parse_args(argv)
+
+    calendar_service.get_credentials()  # Authorize up front instead of inside the first request
+    server = AvailabilityServer((args.host, args.port), workers=args.workers)
+    print(f"Serving availability on http://{args.host}:{server.server_address[1]}/availability")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Runs Calendar API work off the Tk mainloop thread.
+
+Tk widgets may only be touched from the thread running mainloop, so work is
+handed to a thread pool and TaskRunner polls for finished futures with
+root.after, calling the done/error/progress callbacks on the Tk thread.
+
+Tasks are grouped into channels ("availability", "events", ...). Submitting
+to a channel whose current task has the same key merges with it instead of
+starting a duplicate fetch; submitting a different key supersedes the older
+task, whose result is then dropped (a queued one is cancelled outright).
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+import instrumentation
+
+POLL_INTERVAL_MS = 50
+
+
+class Task:
+    def __init__(self, channel, key, on_done, on_error, on_progress):
+        self.channel = channel
+        self.key = key
+        self.on_done = [on_done] if on_done else []
+        self.on_error = [on_error] if on_error else []
+        self.on_progress = [on_progress] if on_progress else []
+        self.future = None
+        self.superseded = False
+
+
+class TaskRunner:
+    def __init__(self, root, max_workers=4, on_busy_change=None):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="calendar-worker")
+        self.on_busy_change = on_busy_change
+        self._current = {}   # channel -> latest Task
+        self._running = []   # every Task whose future hasn't been collected yet
+        self._progress = queue.Queue()
+        self._polling = False
+
+    def submit(self, channel, key, func, on_done=None, on_error=None, on_progress=None):
+        """Run func(report) on a worker thread.
+
+        report(value) may be called from the worker to pass value to on_progress
+        on the Tk thread. Returns the Task, which may be an older merged one.
+        """
+        current = self._current.get(channel)
+        if current is not None and not current.future.done() and current.key == key:
+            # Same inputs already in flight: piggyback on it
+            current.on_done.extend([on_done] if on_done else [])
+            current.on_error.extend([on_error] if on_error else [])
+            current.on_progress.extend([on_progress] if on_progress else [])
+            return current
+
+        if current is not None:
+            current.superseded = True
+            current.future.cancel()
+
+        task = Task(channel, key, on_done, on_error, on_progress)
+        task.future = self.executor.submit(self._run, task, func)
+        self._current[channel] = task
+        self._running.append(task)
+        self._notify_busy()
+        self._schedule_poll()
+        return task
+
+    def _run(self, task, func):
+        with instrumentation.span(f"task.{task.channel}"):
+            return func(lambda value: self._progress.put((task, value)))
+
+    def is_running(self, channel, key):
+        """True while the channel's current task for key is still running, so a submit would join it."""
+        task = self._current.get(channel)
+        return task is not None and not task.future.done() and task.key == key
+
+    def is_busy(self, channel=None):
+        if channel is None:
+            return any(not task.superseded for task in self._running)
+        task = self._current.get(channel)
+        return task is not None and not task.future.done()
+
+    def shutdown(self):
+        for task in self._running:
+            task.future.cancel()
+        self.executor.shutdown(wait=False)
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+
+        # Finished tasks are collected before progress is drained, so a task's last
+        # report() always reaches on_progress before its on_done runs
+        finished = [task for task in self._running if task.future.done()]
+        self._running = [task for task in self._running if task not in finished]
+
+        while True:
+            try:
+                task, value = self._progress.get_nowait()
+            except queue.Empty:
+                break
+            if not task.superseded:
+                for callback in task.on_progress:
+                    callback(value)
+
+        for task in finished:
+            if self._current.get(task.channel) is task:
+                del self._current[task.channel]
+            if task.superseded or task.future.cancelled():
+                continue
+            error = task.future.exception()
+            if error is not None:
+                for callback in task.on_error:
+                    callback(error)
+            else:
+                result = task.future.result()
+                for callback in task.on_done:
+                    callback(result)
+
+        if finished:
+            self._notify_busy()
+        if self._running:
+            self._schedule_poll()
+
+    def _notify_busy(self):
+        if self.on_busy_change:
+            self.on_busy_change(self.is_busy())
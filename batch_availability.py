@@ -0,0 +1,187 @@
+"""Headless batch mode: availability messages for many recipients at once.
+
+    python batch_availability.py --calendar me@example.com recipients.csv -o messages.jsonl
+    python batch_availability.py --calendar me@example.com recipients.csv --format txt > messages.txt
+
+The CSV has a header row with these columns (only recipient is required):
+
+    owner            the owner's name in the greeting ("my" when blank)
+    recipient        the recipient's name
+    second_calendar  a calendar to merge with --calendar (blank: --calendar alone)
+    timezone         one of the app's time zone names (default Atlantic Standard Time)
+    duration         meeting length in minutes (default 30)
+    week             0 for this week, 1 for next week, ... (default 0)
+
+Every row's message is the one CalendarGUI would show for the same inputs.
+The busy data of every distinct (calendar, week) is fetched once up front,
+the weeks in parallel, and the messages are then built on a worker
+pool from the shared caches. Results are written in input order as they
+finish, as JSON lines (with the slots and any per-row error), plain text,
+or CSV. A row that fails is reported and the rest still run; a calendar
+that cannot be read fails only the rows that use it.
+"""
+import argparse
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import availability
+from availability_server import ENGINES, parse_availability_request
+from slot_selection import SELECTORS
+
+DEFAULT_WORKERS = 8
+OUTPUT_FORMATS = ('jsonl', 'txt', 'csv')
+SEPARATOR = "--------------------------------------------\n\n"
+
+
+def read_batch(file, calendar_id, selector_name, engine='events'):
+    """Return [(row number, request or None, error or None)] for every data row of the CSV."""
+    batch = []
+    for row_number, row in enumerate(csv.DictReader(file), 2):  # Row 1 is the header
+        row = {name.strip().lower(): (value or '').strip() for name, value in row.items() if name}
+        fields = {
+            'calendars': [calendar_id, row.get('second_calendar', '')],
+            'recipient': [row.get('recipient', '')],
+            'owner': [row.get('owner', '')],
+            'timezone': [row.get('timezone') or 'Atlantic Standard Time'],
+            'duration': [row.get('duration') or '30'],
+            'week': [row.get('week') or '0'],
+            'selector': [selector_name],
+            'engine': [engine],
+        }
+        try:
+            if not row.get('recipient'):
+                raise ValueError("recipient is required.")
+            batch.append((row_number, parse_availability_request(fields), None))
+        except ValueError as e:
+            batch.append((row_number, None, str(e)))
+    return batch
+
+
+def prefetch(batch, service=None):
+    """Fetch the busy data of every distinct (calendar, week) in the batch, once per engine and week.
+
+    Returns {(engine, calendar_id, Monday): error} for the calendars that could not be read.
+    """
+    calendars_by_engine = {'events': set(), 'freebusy': set()}
+    weeks_by_engine = {'events': set(), 'freebusy': set()}
+    for _, request, _ in batch:
+        if request is None:
+            continue
+        engine = request['engine']
+        calendars_by_engine[engine].update(request['calendar_ids'])
+        monday = availability.get_week_start(request['week_offset'])
+        weeks_by_engine[engine].add(monday)
+    failed = {}
+    for engine, calendar_ids in calendars_by_engine.items():
+        if calendar_ids:
+            errors = availability.prefetch_busy(sorted(calendar_ids), weeks_by_engine[engine], service, engine)
+            failed.update(((engine, calendar_id, monday), error) for (calendar_id, monday), error in errors.items())
+    return failed
+
+
+def compute_message(item, service=None, failed=None):
+    """Return the result dict of one row; a row using a calendar in failed reports that calendar's error."""
+    row_number, request, error = item
+    result = {'row': row_number}
+    if request is not None:
+        result.update(calendars=request['calendar_ids'], recipient=request['recipient_name'],
+                      week=request['week_offset'])
+        monday = availability.get_week_start(request['week_offset'])
+        errors = [failed[(request['engine'], calendar_id, monday)] for calendar_id in request['calendar_ids']
+                  if (request['engine'], calendar_id, monday) in (failed or {})]
+        if errors:
+            error = str(errors[0])  # Already tried once by prefetch; fetching again per row would only repeat it
+        else:
+            try:
+                result.update(availability.get_availability_message(service=service, **request))
+            except Exception as e:
+                error = str(e)
+    if error:
+        result['error'] = error
+    return result
+
+
+def iter_messages(batch, workers=DEFAULT_WORKERS, service=None):
+    """Yield each row's result dict in input order, computed on a pool of workers."""
+    try:
+        failed = prefetch(batch, service)
+    except Exception as e:
+        # Rows then fetch what they need themselves, and report their own errors
+        print(f"Could not prefetch busy data, so rows fetch their own: {e}", file=sys.stderr)
+        failed = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-worker") as executor:
+        yield from executor.map(lambda item: compute_message(item, service, failed), batch)
+
+
+class JsonLinesOutput:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, result):
+        self.file.write(json.dumps(result) + "\n")
+        self.file.flush()  # A stream: readers see each row as soon as it is done
+
+
+class TextOutput:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, result):
+        body = result['text'] if 'text' in result else f"Error: {result['error']}"
+        self.file.write(f"Row {result['row']}: {result.get('recipient', '')}\n\n{body}\n\n{SEPARATOR}")
+
+
+class CsvOutput:
+    def __init__(self, file):
+        self.writer = csv.writer(file)
+        self.writer.writerow(["Row", "Recipient", "Calendars", "Week", "Message", "Error"])
+
+    def write(self, result):
+        self.writer.writerow([result['row'], result.get('recipient', ''), '; '.join(result.get('calendars', ())),
+                              result.get('week', ''), result.get('text', ''), result.get('error', '')])
+
+
+OUTPUTS = {'jsonl': JsonLinesOutput, 'txt': TextOutput, 'csv': CsvOutput}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('csv_path', help="CSV of recipients ('-' reads standard input)")
+    parser.add_argument('--calendar', required=True, help="your calendar (the one the app's email field names)")
+    parser.add_argument('-o', '--output', default='-', help="file to write ('-', the default, is standard output)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default=None,
+                        help="output format (default: from the output file's extension, else jsonl)")
+    parser.add_argument('--selector', choices=list(SELECTORS), default='Random')
+    parser.add_argument('--engine', choices=ENGINES, default='events',
+                        help="how merged rows read busy time (freebusy is one query but cannot ignore Home/Office markers)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+
+    output_format = args.format
+    if output_format is None:
+        extension = args.output.rsplit('.', 1)[-1].lower() if '.' in args.output else ''
+        output_format = extension if extension in OUTPUT_FORMATS else 'jsonl'
+
+    if args.csv_path == '-':
+        batch = read_batch(sys.stdin, args.calendar, args.selector, args.engine)
+    else:
+        with open(args.csv_path, newline='', encoding='utf-8-sig') as f:
+            batch = read_batch(f, args.calendar, args.selector, args.engine)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    failed = 0
+    try:
+        writer = OUTPUTS[output_format](out)
+        for result in iter_messages(batch, args.workers):
+            writer.write(result)
+            failed += 'error' in result
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(batch)} rows, {failed} failed.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
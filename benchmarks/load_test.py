@@ -0,0 +1,149 @@
+"""Load test for availability_server against a fake Calendar backend.
+
+Starts the server in-process on a free port, backed by FakeCalendarService
+with synthetic calendars laid out around the current week (and per-request
+latency, like the real API), then has a number of client threads send a
+seeded mix of single-calendar and merged requests and reports throughput
+and latency:
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --requests 2000 --concurrency 32 --latency 0.05 --workers 16
+
+Like run_benchmarks.py it runs against a throwaway app directory, so the
+real event cache, token and working hours are never touched.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Point ~ at an empty directory before the apps work out their paths
+os.environ['HOME'] = os.environ['USERPROFILE'] = tempfile.mkdtemp(prefix="calendar-load-")
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import availability  # noqa: E402
+from availability_server import AvailabilityServer  # noqa: E402
+from fake_calendar_service import FakeCalendarService  # noqa: E402
+from slot_selection import SELECTORS  # noqa: E402
+from synthetic_calendars import generate_calendars  # noqa: E402
+
+DEFAULT_REQUESTS = 1000
+DEFAULT_CONCURRENCY = 16
+DEFAULT_WORKERS = 8
+DEFAULT_LATENCY = 0.02
+DEFAULT_PER_PROFILE = 4
+# Dense and double-booked calendars merge to nothing, so merged requests draw from these
+MERGE_PROFILES = ('sparse', 'all_day', 'recurring', 'markers')
+
+
+def make_requests(calendar_ids, count, seed):
+    """Return count query strings: a seeded mix of coordinators asking about one calendar or merging a few."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        people = 1 if rng.random() < 0.4 else rng.randint(2, 5)
+        queries.append(urlencode({
+            'calendars': ','.join(rng.sample(calendar_ids, people)),
+            'week': rng.choice((0, 1)),
+            'duration': rng.choice((30, 60)),
+            'timezone': rng.choice(list(availability.TIMEZONES)),
+            'selector': rng.choice(list(SELECTORS)),
+            'recipient': "Sam",
+        }))
+    return queries
+
+
+def run_clients(port, queries, concurrency):
+    """Send every query from concurrency keep-alive clients; return ([latency ms], [error descriptions])."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    next_query = iter(queries)
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while True:
+            with lock:
+                query = next(next_query, None)
+            if query is None:
+                break
+            started = time.perf_counter()
+            try:
+                connection.request('GET', f'/availability?{query}')
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                with lock:
+                    errors.append(type(e).__name__)
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed_ms)
+                if response.status != 200:
+                    errors.append(f"{response.status}: {json.loads(body).get('error')}")
+        connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    return latencies, errors
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="client threads")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="server worker threads")
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="seconds added to every fake API request")
+    parser.add_argument('--per-profile', type=int, default=DEFAULT_PER_PROFILE, help="calendars of each profile")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    calendars = generate_calendars(availability.get_week_start(0), weeks=3, seed=args.seed,
+                                   profiles=MERGE_PROFILES, per_profile=args.per_profile)
+    service = FakeCalendarService(calendars, latency=args.latency)
+    server = AvailabilityServer(('127.0.0.1', 0), service=service, workers=args.workers)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    queries = make_requests(sorted(calendars), args.requests, args.seed)
+    started = time.perf_counter()
+    latencies, errors = run_clients(server.server_address[1], queries, args.concurrency)
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    server.server_close()
+
+    print(f"{len(queries)} requests, {args.concurrency} clients, {args.workers} server workers, "
+          f"{len(calendars)} calendars, {args.latency * 1000:.0f} ms backend latency")
+    print(f"  throughput   {len(latencies) / elapsed:10.1f} requests/s")
+    if latencies:
+        print(f"  latency p50  {percentile(latencies, 0.50):10.1f} ms")
+        print(f"  latency p90  {percentile(latencies, 0.90):10.1f} ms")
+        print(f"  latency p99  {percentile(latencies, 0.99):10.1f} ms")
+        print(f"  latency max  {max(latencies):10.1f} ms   (mean {statistics.mean(latencies):.1f} ms)")
+    print(f"  backend calls {service.request_count:9}")
+    print(f"  errors       {len(errors):10}")
+    for error in sorted(set(errors))[:5]:
+        print(f"    {error}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
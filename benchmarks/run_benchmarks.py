@@ -0,0 +1,308 @@
+"""Offline benchmarks for the availability code, compared against a stored baseline.
+
+Runs without a Google account: calendars come from synthetic_calendars and
+are served by FakeCalendarService, optionally with injected per-request
+latency. Everything runs against a throwaway app directory, so the real event
+cache, token and working hours are never touched.
+
+    python benchmarks/run_benchmarks.py                  # run and compare with baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline  # run and record the results as the new baseline
+    python benchmarks/run_benchmarks.py -k common        # only cases whose name contains "common"
+
+A case fails the comparison when its result (a digest of the slots it
+found) differs, which means an optimization changed behaviour, or when its
+fastest time is more than --tolerance slower than the baseline. Timings are
+only comparable between runs on the same machine, so against a baseline
+recorded elsewhere a slower case is reported but does not fail the run.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Point ~ at an empty directory before the apps work out their paths
+os.environ['HOME'] = os.environ['USERPROFILE'] = tempfile.mkdtemp(prefix="calendar-bench-")
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import availability  # noqa: E402
+import CalendarNote  # noqa: E402
+import quorum  # noqa: E402
+from event_cache import get_event_cache  # noqa: E402
+from event_records import records_from_api  # noqa: E402
+from fake_calendar_service import FakeCalendarService  # noqa: E402
+from slot_selection import SELECTORS  # noqa: E402
+from synthetic_calendars import PROFILES, generate_calendars  # noqa: E402
+
+ANCHOR_DATE = date(2024, 3, 4)  # A Monday; algorithm cases use fixed dates so their results never drift
+HORIZON_WEEKS = 12
+# Merging dense or double-booked calendars leaves almost nothing to expand, so the slot cases use these
+MERGE_PROFILES = ('sparse', 'all_day', 'recurring', 'markers')
+DEFAULT_REPEATS = 7
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_LATENCY = 0.02
+NOISE_FLOOR_MS = 1.0  # Differences smaller than this are timer and scheduler noise, not regressions
+
+
+def digest(value):
+    return hashlib.sha1(repr(value).encode('utf-8')).hexdigest()[:12]
+
+
+def week_digest(lines):
+    """Digest formatted availability by weekday and time, dropping the dates that move with the current week."""
+    return digest([re.sub(r'^(\w+), .*?:\n', r'\1:\n', line) for line in lines])
+
+
+def machine_fingerprint():
+    # Identifies the machine a baseline's timings came from, without recording its name
+    return digest((platform.node(), platform.machine(), platform.processor(), platform.python_version()))
+
+
+class Benchmarks:
+    """Each case_* method prepares its inputs and returns (run, describe): run() is timed,
+    describe(result) turns its result into something stable to compare with the baseline."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.day_windows = availability.get_day_windows(ANCHOR_DATE, ANCHOR_DATE + timedelta(weeks=HORIZON_WEEKS, days=-1))
+        self.calendars = generate_calendars(ANCHOR_DATE, weeks=HORIZON_WEEKS, seed=1)
+        self.records = {calendar_id: records_from_api(events) for calendar_id, events in self.calendars.items()}
+        self.open_slots = {calendar_id: self.open_slots_of(records) for calendar_id, records in self.records.items()}
+        self.merge_open_slots = {calendar_id: open_slots for calendar_id, open_slots in self.open_slots.items()
+                                 if calendar_id.split('-')[0] in MERGE_PROFILES}
+
+        # Full runs ask for "this week", so their calendars are laid out around the current week
+        week_start = availability.get_week_start(0)
+        self.live_calendars = generate_calendars(week_start, weeks=2, seed=1)
+        self.live_ids = sorted(calendar_id for calendar_id in self.live_calendars if calendar_id.split('-')[0] in MERGE_PROFILES)
+
+    def open_slots_of(self, records):
+        return [availability.get_open_slots(day_records, start, end)
+                for day_records, (start, end) in zip(availability.group_events_by_day(records, self.day_windows), self.day_windows)]
+
+    # Algorithm layer
+
+    def case_get_open_slots_dense(self):
+        records = self.records['dense-0@example.com']
+        return (lambda: self.open_slots_of(records)), digest
+
+    def case_get_open_slots_all_profiles(self):
+        return (lambda: [self.open_slots_of(records) for records in self.records.values()]), digest
+
+    def case_find_common_slots(self):
+        per_day = list(zip(*self.merge_open_slots.values()))
+        return (lambda: [availability.find_common_slots(*day) for day in per_day]), digest
+
+    def case_expand_slots(self):
+        return (lambda: list(availability.iter_candidate_slots(self.merge_open_slots, self.day_windows, 30))), digest
+
+    def case_select_best_fit(self):
+        selector = SELECTORS["Best Fit"](0)
+        return (lambda: selector.select(availability.iter_candidate_slots(self.merge_open_slots, self.day_windows, 30))), digest
+
+    def case_rank_quorum_slots(self):
+        """A 36-person panel over the whole horizon, at least three quarters of them free."""
+        panel = generate_calendars(ANCHOR_DATE, weeks=HORIZON_WEEKS, seed=2, profiles=MERGE_PROFILES, per_profile=9)
+        open_slots = {calendar_id: self.open_slots_of(records_from_api(events)) for calendar_id, events in panel.items()}
+        min_free = len(open_slots) * 3 // 4
+        return (lambda: quorum.rank_quorum_slots(open_slots, self.day_windows, 30, min_free,
+                                                 required=['sparse-0@example.com', 'recurring-0@example.com'])), digest
+
+    # Full runs through the fake service (results are digested by weekday: their dates move with the current week)
+
+    def live_service(self):
+        return FakeCalendarService(self.live_calendars, latency=self.latency)
+
+    def cold(self, func):
+        def run():
+            get_event_cache().invalidate()
+            availability.invalidate_availability()
+            return func()
+        return run
+
+    def warm(self, func):
+        """The event cache filled, but no memoized availability."""
+        func()
+
+        def run():
+            availability.invalidate_availability()
+            return func()
+        return run
+
+    def case_get_availability_cold(self):
+        service = self.live_service()
+        return self.cold(lambda: availability.get_availability('sparse-0@example.com', service=service)), week_digest
+
+    def case_get_availability_warm(self):
+        service = self.live_service()
+        return self.warm(lambda: availability.get_availability('sparse-0@example.com', service=service)), week_digest
+
+    def case_get_availability_memoized(self):
+        service = self.live_service()
+        availability.get_availability('sparse-0@example.com', service=service)
+        return (lambda: availability.get_availability('sparse-0@example.com', service=service)), week_digest
+
+    def case_get_availability_new_duration(self):
+        """The week's busy data memoized; only the open slots for another duration are recomputed."""
+        service = self.live_service()
+        availability.get_availability('sparse-0@example.com', service=service)
+
+        def run():
+            availability.day_open_cache.clear()
+            availability.selection_cache.clear()
+            return availability.get_availability('sparse-0@example.com', duration_minutes=60, service=service)
+        return run, week_digest
+
+    def case_common_free_slots_freebusy(self):
+        service = self.live_service()
+        return self.cold(lambda: availability.get_common_free_slots(self.live_ids, service=service, engine='freebusy')), week_digest
+
+    def case_common_free_slots_new_timezone(self):
+        """Everything memoized, so changing the time zone only reformats."""
+        service = self.live_service()
+        availability.get_common_free_slots(self.live_ids, service=service, engine='freebusy')
+        return (lambda: availability.get_common_free_slots(self.live_ids, timezone_name='Pacific Standard Time', service=service,
+                                                          engine='freebusy')), week_digest
+
+    def case_common_free_slots_opaque_markers(self):
+        """Merged with the default engine, which must still see past busy "Home"/"Office" markers."""
+        service = self.live_service()
+        calendar_ids = ['sparse-0@example.com', 'opaque_markers-0@example.com']
+        return self.cold(lambda: availability.get_common_free_slots(calendar_ids, service=service)), week_digest
+
+    def case_common_free_slots_events_cold(self):
+        service = self.live_service()
+        return self.cold(lambda: availability.get_common_free_slots(self.live_ids, service=service, engine='events')), week_digest
+
+    def case_common_free_slots_events_warm(self):
+        service = self.live_service()
+        return self.warm(lambda: availability.get_common_free_slots(self.live_ids, service=service, engine='events')), week_digest
+
+    # Rendering (needs a display)
+
+    def case_show_events_render(self):
+        return self.render_case(rerender=False)
+
+    def case_show_events_rerender(self):
+        return self.render_case(rerender=True)
+
+    def render_case(self, rerender):
+        """Time showing a busy day in CalendarNote, either fresh or over the same day already on screen."""
+        import tkinter as tk
+        from tkinter import ttk
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            return None
+        root.withdraw()
+        CalendarNote.root = root
+        CalendarNote.build_event_list(ttk.Frame(root))
+        events = [record for records in self.records.values() for record in records
+                  if record.start_datetime().date() == ANCHOR_DATE]
+        chosen_date = datetime.combine(ANCHOR_DATE, datetime.min.time())
+
+        def run():
+            if not rerender:
+                CalendarNote.update_event_list({})
+            CalendarNote.display_events(events, chosen_date)
+            root.update_idletasks()
+            return len(CalendarNote.events_tree.get_children())
+        return run, (lambda count: count)
+
+    def cases(self):
+        return [(name[len('case_'):], getattr(self, name)) for name in dir(self) if name.startswith('case_')]
+
+
+def time_case(run, repeats):
+    run()  # Warm-up: first-call costs (imports, lazy setup) are not what is being measured
+    timings = []
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+def compare(measured, baseline, tolerance, same_machine=True):
+    """Return a status word for one case against its baseline entry; upper case fails the run."""
+    if baseline is None:
+        return "new"
+    if measured['result'] != baseline['result']:
+        return "CHANGED"
+    # The fastest run is the least disturbed by the rest of the machine, so it is what gets compared
+    allowed = max(baseline['min_ms'] * tolerance, NOISE_FLOOR_MS)
+    if measured['min_ms'] > baseline['min_ms'] + allowed:
+        return "SLOWER" if same_machine else "slower"
+    if measured['min_ms'] < baseline['min_ms'] - allowed:
+        return "faster"
+    return "ok"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', dest='pattern', default='', help="only run cases whose name contains this")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="seconds added to every fake API request")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown before a case fails")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    baseline_cases = baseline.get('cases', {})
+
+    if baseline and baseline.get('latency') != args.latency and not args.save_baseline:
+        print(f"Note: the baseline was recorded with --latency {baseline.get('latency')}; "
+              f"cases that fetch are not comparable at {args.latency}.")
+    same_machine = baseline.get('machine') == machine_fingerprint()
+    if baseline and not same_machine and not args.save_baseline:
+        print("Note: the baseline was recorded on another machine; timings are reported but only results are checked.")
+
+    benchmarks = Benchmarks(args.latency)
+    results = {}
+    failed = False
+    print(f"{'case':36} {'median ms':>10} {'min ms':>10} {'base min':>10}  status")
+    for name, prepare in benchmarks.cases():
+        if args.pattern not in name:
+            continue
+        case = prepare()
+        if case is None:
+            print(f"{name:36} {'':>10} {'':>10} {'':>10}  skipped")
+            continue
+        run, describe = case
+        timings, result = time_case(run, args.repeats)
+        measured = {'median_ms': round(statistics.median(timings), 3), 'min_ms': round(min(timings), 3),
+                    'result': describe(result)}
+        results[name] = measured
+        status = compare(measured, baseline_cases.get(name), args.tolerance, same_machine)
+        failed = failed or status in ("CHANGED", "SLOWER")
+        baseline_ms = f"{baseline_cases[name]['min_ms']:.2f}" if name in baseline_cases else "-"
+        print(f"{name:36} {measured['median_ms']:10.2f} {measured['min_ms']:10.2f} {baseline_ms:>10}  {status}")
+
+    if args.save_baseline:
+        baseline_cases.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'latency': args.latency, 'machine': machine_fingerprint(), 'profiles': list(PROFILES), 'cases': baseline_cases},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Seeded generator of realistic, API-shaped calendars for the benchmarks.
+
+Each profile imitates a kind of calendar the apps meet in practice:
+
+    sparse       a few meetings a day
+    dense        back-to-back meetings from before opening to after close
+    overlapping  double-booked meetings that overlap one another
+    all_day      ordinary days plus all-day events (vacation, conferences)
+    recurring    expanded instances of daily and weekly series, as singleEvents=True returns them
+    markers      "Home"/"Office" working-location markers (marked free) around ordinary meetings
+    opaque_markers  the same markers left busy, as most people create them; only the
+                 events engine, which ignores them by title, sees the meetings around them
+
+The same seed always produces the same events, so timings and results can be
+compared between runs:
+
+    calendars = generate_calendars(date(2024, 3, 4), weeks=4, seed=1)
+    service = FakeCalendarService(calendars, latency=0.05)
+"""
+import random
+from datetime import datetime, time, timedelta
+import pytz
+
+PROFILES = ('sparse', 'dense', 'overlapping', 'all_day', 'recurring', 'markers', 'opaque_markers')
+DEFAULT_TIMEZONE = 'America/Halifax'
+
+MEETING_TITLES = ["1:1", "Team Sync", "Design Review", "Planning", "Customer Call", "Interview", "Lunch", "Retro"]
+
+
+class CalendarGenerator:
+    """Builds the events of one calendar, one working day at a time."""
+
+    def __init__(self, calendar_id, start_date, weeks, seed, timezone=DEFAULT_TIMEZONE):
+        self.calendar_id = calendar_id
+        self.start_date = start_date
+        self.weeks = weeks
+        self.rng = random.Random(seed)
+        self.timezone = pytz.timezone(timezone)
+        self.events = []
+
+    def days(self):
+        for offset in range(self.weeks * 7):
+            day = self.start_date + timedelta(days=offset)
+            if day.weekday() < 5:
+                yield day
+
+    def at(self, day, minutes):
+        return self.timezone.localize(datetime.combine(day, time()) + timedelta(minutes=minutes))
+
+    def add(self, start, end, summary=None, **extra):
+        event = {
+            'kind': 'calendar#event',
+            'id': f"{self.calendar_id.split('@')[0]}-{len(self.events)}",
+            'status': 'confirmed',
+            'summary': summary or self.rng.choice(MEETING_TITLES),
+            'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': end.isoformat()},
+            'attendees': [{'email': self.calendar_id}],
+        }
+        event.update(extra)
+        self.events.append(event)
+        return event
+
+    def add_all_day(self, day, days=1, summary="Out of Office"):
+        event = self.add(self.at(day, 0), self.at(day, 0), summary)
+        event['start'] = {'date': day.isoformat()}
+        event['end'] = {'date': (day + timedelta(days=days)).isoformat()}
+        return event
+
+    def add_meetings(self, day, count, earliest=9 * 60, latest=18 * 60):
+        for _ in range(count):
+            start = self.rng.randrange(earliest, latest - 30, 15)
+            length = self.rng.choice([15, 30, 30, 45, 60, 90])
+            self.add(self.at(day, start), self.at(day, start + length))
+
+    def sparse(self):
+        for day in self.days():
+            self.add_meetings(day, self.rng.randint(0, 2))
+
+    def dense(self):
+        for day in self.days():
+            minute = 8 * 60 + self.rng.choice([0, 30])
+            while minute < 18 * 60:
+                length = self.rng.choice([15, 30, 30, 45, 60])
+                self.add(self.at(day, minute), self.at(day, minute + length))
+                minute += length + self.rng.choice([0, 0, 0, 5, 15, 30])
+
+    def overlapping(self):
+        for day in self.days():
+            self.add_meetings(day, self.rng.randint(4, 8), earliest=10 * 60, latest=17 * 60)
+
+    def all_day(self):
+        days = list(self.days())
+        for day in days:
+            self.add_meetings(day, self.rng.randint(1, 3))
+        for day in self.rng.sample(days, max(1, len(days) // 5)):
+            self.add_all_day(day, days=self.rng.choice([1, 1, 2]), summary=self.rng.choice(["Vacation", "Conference"]))
+
+    def recurring(self):
+        # Instances of expanded series carry their series id, like the API's singleEvents=True listings
+        series = [("Daily Standup", 9 * 60 + 30, 15, None), ("Weekly 1:1", 14 * 60, 30, 1), ("Team Sync", 11 * 60, 60, 3)]
+        for index, (summary, start, length, weekday) in enumerate(series):
+            series_id = f"{self.calendar_id.split('@')[0]}-series{index}"
+            for day in self.days():
+                if weekday is None or day.weekday() == weekday:
+                    self.add(self.at(day, start), self.at(day, start + length), summary,
+                             id=f"{series_id}_{day.strftime('%Y%m%d')}", recurringEventId=series_id)
+        for day in self.days():
+            self.add_meetings(day, self.rng.randint(0, 2))
+
+    def markers(self):
+        # Working-location markers span the working day but are marked free, so freebusy ignores them too
+        for day in self.days():
+            self.add(self.at(day, 9 * 60), self.at(day, 17 * 60), self.rng.choice(["Home", "Office"]),
+                     transparency='transparent')
+            self.add_meetings(day, self.rng.randint(1, 3))
+
+    def opaque_markers(self):
+        # Created like any other event, so freebusy reports the whole working day as busy
+        for day in self.days():
+            self.add(self.at(day, 9 * 60), self.at(day, 17 * 60), self.rng.choice(["Home", "Office"]))
+            self.add_meetings(day, self.rng.randint(1, 3))
+
+
+def generate_calendar(calendar_id, profile, start_date, weeks=1, seed=0, timezone=DEFAULT_TIMEZONE):
+    """Return the events of one calendar of the given profile, starting on start_date."""
+    generator = CalendarGenerator(calendar_id, start_date, weeks, seed, timezone)
+    getattr(generator, profile)()
+    return generator.events
+
+
+def generate_calendars(start_date, weeks=1, seed=0, profiles=PROFILES, per_profile=1):
+    """Return {calendar_id: events} with per_profile calendars of every profile, ids like 'dense-0@example.com'."""
+    calendars = {}
+    for profile in profiles:
+        for index in range(per_profile):
+            calendar_id = f"{profile}-{index}@example.com"
+            calendars[calendar_id] = generate_calendar(
+                calendar_id, profile, start_date, weeks, seed=f"{seed}:{calendar_id}")
+    return calendars
@@ -0,0 +1,201 @@
+"""Process-wide authorized Calendar service shared by CalendarGUI and CalendarNote.
+
+Credentials are loaded once per process and a daemon thread refreshes them a
+few minutes before they expire. The service is built from the discovery
+document bundled with google-api-python-client (static_discovery) so no
+request goes out for it; each thread keeps its own service object because
+the underlying httplib2 client is not thread-safe. Button handlers therefore
+never wait on auth or discovery after the first build, which warm_up() can
+also move off the click path.
+
+The Google client libraries take a few hundred milliseconds to import, so
+they are only imported once the first fetch needs them.
+
+Event listings ask for large pages and a fields= partial-response mask, so
+each consumer downloads only the event fields it reads. Responses are
+already gzip-compressed: the client library sends Accept-Encoding: gzip and
+the "(gzip)" user-agent suffix Google requires on every request.
+
+PyInstaller builds must ship the bundled discovery documents
+(--collect-data googleapiclient) for static_discovery to find them.
+"""
+import os
+import pickle
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import instrumentation
+
+SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+
+MAX_FETCH_WORKERS = 8
+FETCH_THREAD_PREFIX = "calendar-fetch"
+
+EVENTS_PAGE_SIZE = 2500  # The most events().list returns per page; masked events are small
+
+# Partial-response masks (fields=) for each kind of events().list caller
+AVAILABILITY_EVENT_FIELDS = "nextPageToken,items(start,end,summary)"
+NOTES_EVENT_FIELDS = "nextPageToken,items(id,start,end,summary,attendees/email)"
+SYNC_EVENT_FIELDS = "nextPageToken,nextSyncToken,items(id,status,start,end,summary,attendees/email)"
+FREEBUSY_FIELDS = "calendars"  # A map keyed by calendar id, so it is kept whole
+
+REFRESH_MARGIN = timedelta(minutes=5)
+REFRESH_RETRY_SECONDS = 60
+
+_credentials = None
+_credentials_lock = threading.Lock()
+_thread_state = threading.local()
+_refresh_thread = None
+_fetch_executor = None
+_fetch_executor_lock = threading.Lock()
+
+
+def get_resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller."""
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+def get_app_dir():
+    app_dir = os.path.join(os.path.expanduser("~"), ".calendar_app")
+    os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+
+def get_token_path():
+    return os.path.join(get_app_dir(), "token.pickle")
+
+
+def save_credentials(creds):
+    with open(get_token_path(), 'wb') as token:
+        pickle.dump(creds, token)
+
+
+def load_credentials():
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.auth.transport.requests import Request
+
+    creds = None
+    credentials_path = get_resource_path('credentials.json')
+    token_path = get_token_path()
+
+    if os.path.exists(token_path):
+        with open(token_path, 'rb') as token:
+            creds = pickle.load(token)
+
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
+            creds = flow.run_local_server(port=0)
+        save_credentials(creds)
+
+    return creds
+
+
+def get_credentials():
+    """Return the shared credentials, authorizing on first use."""
+    global _credentials
+    with _credentials_lock:
+        if _credentials is None:
+            with instrumentation.span("auth"):
+                _credentials = load_credentials()
+            start_refresh_thread()
+        return _credentials
+
+
+def get_service():
+    """Return this thread's Calendar service, built from the shared credentials on first use."""
+    # httplib2 connections are not thread-safe, so each worker thread gets its own client
+    service = getattr(_thread_state, 'service', None)
+    if service is None:
+        credentials = get_credentials()
+        with instrumentation.span("client.build"):
+            from googleapiclient.discovery import build
+            service = build('calendar', 'v3', credentials=credentials,
+                            static_discovery=True, cache_discovery=False)
+        _thread_state.service = service
+    return service
+
+
+def iter_event_pages(service, fields, **params):
+    """Yield each events().list response page as it arrives, following nextPageToken to the end.
+
+    fields is the partial-response mask and must include nextPageToken (and
+    nextSyncToken for sync listings); params are passed to events().list.
+    """
+    page_token = None
+    while True:
+        response = instrumentation.execute(service.events().list(
+            pageToken=page_token, maxResults=EVENTS_PAGE_SIZE, fields=fields, **params), 'events.list')
+        yield response
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def map_concurrently(func, items):
+    """Return [func(item) for item in items], running the calls on the shared fetch pool.
+
+    Each pool thread talks to Google through its own get_service() client, so
+    N calendars cost about one round trip instead of N. Calls made from inside
+    the pool run inline rather than waiting on a pool that may already be full.
+    """
+    return list(iter_concurrently(func, items))
+
+
+def iter_concurrently(func, items):
+    """Like map_concurrently, but yield each result, in input order, as soon as it is ready."""
+    items = list(items)
+    if len(items) <= 1 or threading.current_thread().name.startswith(FETCH_THREAD_PREFIX):
+        return (func(item) for item in items)
+    return get_fetch_executor().map(func, items)
+
+
+def get_fetch_executor():
+    global _fetch_executor
+    with _fetch_executor_lock:
+        if _fetch_executor is None:
+            _fetch_executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix=FETCH_THREAD_PREFIX)
+        return _fetch_executor
+
+
+def warm_up():
+    """Authorize on a daemon thread so the first fetch doesn't pay for it."""
+    def build_quietly():
+        try:
+            get_credentials()
+        except Exception:
+            pass  # The first real fetch retries and reports the error
+    threading.Thread(target=build_quietly, name="calendar-service-warm-up", daemon=True).start()
+
+
+def start_refresh_thread():
+    global _refresh_thread
+    if _refresh_thread is None or not _refresh_thread.is_alive():
+        _refresh_thread = threading.Thread(target=_refresh_loop, name="calendar-credentials-refresh", daemon=True)
+        _refresh_thread.start()
+
+
+def _refresh_loop():
+    from google.auth.transport.requests import Request
+
+    wake_up = threading.Event()
+    while True:
+        creds = _credentials
+        if creds is None or creds.expiry is None or not creds.refresh_token:
+            return  # Nothing that expires, or nothing to refresh it with
+
+        # google-auth keeps expiry as a naive UTC datetime
+        wait_seconds = (creds.expiry - REFRESH_MARGIN - datetime.utcnow()).total_seconds()
+        wake_up.wait(max(wait_seconds, 0))
+        try:
+            creds.refresh(Request())
+            save_credentials(creds)
+        except Exception:
+            wake_up.wait(REFRESH_RETRY_SECONDS)
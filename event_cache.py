@@ -0,0 +1,279 @@
+"""On-disk event store shared by CalendarGUI and CalendarNote.
+
+Each calendar is filled once with a full events().list over a window around
+today and then kept current with incremental syncToken requests, which only
+return what changed since the previous sync. Lookups inside the synced
+window are answered from SQLite as EventRecords; anything outside it returns None so the
+caller can fall back to a live request.
+
+Code that keeps results derived from events (the availability module's
+model) can add_change_listener() to hear which events each sync moved,
+added or removed, and update just the affected days.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+import pytz
+import instrumentation
+from calendar_service import SYNC_EVENT_FIELDS, get_app_dir, iter_event_pages
+from event_records import EventRecord
+
+SYNC_PAST_DAYS = 30
+SYNC_FUTURE_DAYS = 180
+SYNC_INTERVAL_SECONDS = 60  # Lookups within this long of the last sync skip the incremental request
+
+SCHEMA_VERSION = 2  # Bump when the tables change; older caches are dropped and refilled
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    all_day INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    attendees TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar_id, start_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    window_start_ts REAL NOT NULL,
+    window_end_ts REAL NOT NULL,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+_change_listeners = []
+
+
+def add_change_listener(listener):
+    """Call listener(calendar_id, changes) after each sync that changed when a calendar is busy.
+
+    changes is [(old EventRecord or None, new EventRecord or None), ...]; a
+    pair with both records is an event that moved or changed whether it
+    counts as busy. Listeners run on whichever thread synced, inside the sync.
+    """
+    _change_listeners.append(listener)
+
+
+def busy_key(record):
+    # The parts of an event availability depends on
+    return None if record is None else (record.start, record.end, record.ignored)
+
+
+def get_cache_path():
+    return os.path.join(get_app_dir(), "events.sqlite3")
+
+
+class EventCache:
+    def __init__(self, path=None):
+        self.path = path or get_cache_path()
+        self._local = threading.local()
+        self._sync_locks = {}
+        self._sync_locks_guard = threading.Lock()
+        # A private in-memory database only exists on the connection that created it
+        self._shared_connection = None
+        if self.path == ':memory:':
+            self._shared_connection = sqlite3.connect(':memory:', check_same_thread=False)
+            self._shared_lock = threading.RLock()
+            self._create_schema(self._shared_connection)
+        else:
+            self._create_schema(self._connect())
+
+    @staticmethod
+    def _create_schema(connection):
+        if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            connection.executescript('DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS sync_state;')
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        connection.executescript(SCHEMA)
+
+    def _connect(self):
+        if self._shared_connection is not None:
+            return self._shared_connection
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self):
+        connection = self._connect()
+        if self._shared_connection is not None:
+            return _LockedConnection(connection, self._shared_lock)
+        return connection
+
+    def _sync_lock(self, calendar_id):
+        with self._sync_locks_guard:
+            return self._sync_locks.setdefault(calendar_id, threading.Lock())
+
+    def get_sync_state(self, calendar_id):
+        with self._transaction() as connection:
+            return connection.execute(
+                'SELECT sync_token, window_start_ts, window_end_ts, synced_at FROM sync_state WHERE calendar_id = ?',
+                (calendar_id,)).fetchone()
+
+    def get_events(self, calendar_id, time_min_iso, time_max_iso, service):
+        """Return EventRecords overlapping the range ordered by start, or None when the range is not cached."""
+        time_min_ts = datetime.fromisoformat(time_min_iso).timestamp()
+        time_max_ts = datetime.fromisoformat(time_max_iso).timestamp()
+
+        with instrumentation.span("cache.sync", calendar_id=calendar_id):
+            self.sync(calendar_id, service)
+        state = self.get_sync_state(calendar_id)
+        if state is None or time_min_ts < state[1] or time_max_ts > state[2]:
+            instrumentation.count("event_cache.miss")
+            return None
+        instrumentation.count("event_cache.hit")
+
+        with self._transaction() as connection:
+            rows = connection.execute(
+                'SELECT event_id, start_ts, end_ts, all_day, summary, attendees FROM events '
+                'WHERE calendar_id = ? AND start_ts < ? AND end_ts > ? ORDER BY start_ts, end_ts',
+                (calendar_id, time_max_ts, time_min_ts)).fetchall()
+        return [EventRecord(event_id, start_ts, end_ts, bool(all_day), summary, attendees.split('\n') if attendees else ())
+                for event_id, start_ts, end_ts, all_day, summary, attendees in rows]
+
+    def sync(self, calendar_id, service, force=False):
+        """Bring a calendar up to date and return the events that changed (cancelled ones included)."""
+        from googleapiclient.errors import HttpError
+
+        with self._sync_lock(calendar_id):
+            state = self.get_sync_state(calendar_id)
+            if state and not force and time.time() - state[3] < SYNC_INTERVAL_SECONDS:
+                return []
+
+            if state and state[0]:
+                try:
+                    return self._incremental_sync(calendar_id, state, service)
+                except HttpError as e:
+                    # 410 Gone: the sync token expired and the calendar has to be refilled
+                    if e.resp.status != 410:
+                        raise
+            return self._full_sync(calendar_id, service)
+
+    def invalidate(self, calendar_id=None):
+        with self._transaction() as connection:
+            if calendar_id is None:
+                connection.execute('DELETE FROM events')
+                connection.execute('DELETE FROM sync_state')
+            else:
+                connection.execute('DELETE FROM events WHERE calendar_id = ?', (calendar_id,))
+                connection.execute('DELETE FROM sync_state WHERE calendar_id = ?', (calendar_id,))
+
+    def _full_sync(self, calendar_id, service):
+        now = datetime.now(pytz.utc)
+        window_start = now - timedelta(days=SYNC_PAST_DAYS)
+        window_end = now + timedelta(days=SYNC_FUTURE_DAYS)
+        events, sync_token = self._list_all(service, calendarId=calendar_id, singleEvents=True,
+                                            timeMin=window_start.isoformat(), timeMax=window_end.isoformat())
+
+        with self._transaction() as connection:
+            # A reload is diffed against what was there, so listeners still only hear about real changes
+            old_records = self._load_records(connection, calendar_id) if _change_listeners else {}
+            connection.execute('DELETE FROM events WHERE calendar_id = ?', (calendar_id,))
+            changes = self._apply(connection, calendar_id, events)
+            connection.execute(
+                'INSERT OR REPLACE INTO sync_state (calendar_id, sync_token, window_start_ts, window_end_ts, synced_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (calendar_id, sync_token, window_start.timestamp(), window_end.timestamp(), time.time()))
+        new_records = {new.event_id: new for _, new in changes if new is not None}
+        changes = [(old_records.get(event_id), new) for event_id, new in new_records.items()
+                   if busy_key(old_records.get(event_id)) != busy_key(new)]
+        changes.extend((old, None) for event_id, old in old_records.items() if event_id not in new_records)
+        self._notify(calendar_id, changes)
+        return events
+
+    def _incremental_sync(self, calendar_id, state, service):
+        events, sync_token = self._list_all(service, calendarId=calendar_id, singleEvents=True, syncToken=state[0])
+
+        with self._transaction() as connection:
+            changes = self._apply(connection, calendar_id, events, with_old=bool(_change_listeners))
+            connection.execute(
+                'UPDATE sync_state SET sync_token = ?, synced_at = ? WHERE calendar_id = ?',
+                (sync_token, time.time(), calendar_id))
+        self._notify(calendar_id, [(old, new) for old, new in changes if busy_key(old) != busy_key(new)])
+        return events
+
+    @staticmethod
+    def _notify(calendar_id, changes):
+        if changes:
+            for listener in _change_listeners:
+                listener(calendar_id, changes)
+
+    @staticmethod
+    def _load_records(connection, calendar_id, event_id=None):
+        query = 'SELECT event_id, start_ts, end_ts, all_day, summary, attendees FROM events WHERE calendar_id = ?'
+        params = (calendar_id,)
+        if event_id is not None:
+            query += ' AND event_id = ?'
+            params += (event_id,)
+        return {event_id: EventRecord(event_id, start_ts, end_ts, bool(all_day), summary, attendees.split('\n') if attendees else ())
+                for event_id, start_ts, end_ts, all_day, summary, attendees in connection.execute(query, params)}
+
+    @staticmethod
+    def _list_all(service, **params):
+        events = []
+        for page in iter_event_pages(service, SYNC_EVENT_FIELDS, **params):
+            events.extend(page.get('items', []))
+        return events, page.get('nextSyncToken')
+
+    @classmethod
+    def _apply(cls, connection, calendar_id, events, with_old=False):
+        """Write the events and return [(old record or None, new record or None)] for each;
+        old records are only looked up when with_old is set."""
+        changes = []
+        for event in events:
+            old = None
+            if with_old:
+                old = cls._load_records(connection, calendar_id, event['id']).get(event['id'])
+            if event.get('status') == 'cancelled':
+                connection.execute('DELETE FROM events WHERE calendar_id = ? AND event_id = ?',
+                                   (calendar_id, event['id']))
+                changes.append((old, None))
+                continue
+            record = EventRecord.from_api(event)
+            changes.append((old, record))
+            connection.execute(
+                'INSERT OR REPLACE INTO events (calendar_id, event_id, start_ts, end_ts, all_day, summary, attendees) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (calendar_id, record.event_id, record.start, record.end, int(record.all_day), record.summary,
+                 '\n'.join(record.attendees)))
+        return changes
+
+
+class _LockedConnection:
+    """Serializes use of the single shared connection behind an in-memory cache."""
+
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self._connection.__enter__()
+
+    def __exit__(self, *exc_info):
+        try:
+            return self._connection.__exit__(*exc_info)
+        finally:
+            self._lock.release()
+
+
+_event_cache = None
+_event_cache_lock = threading.Lock()
+
+
+def get_event_cache():
+    """Return the process-wide cache backed by ~/.calendar_app/events.sqlite3."""
+    global _event_cache
+    with _event_cache_lock:
+        if _event_cache is None:
+            _event_cache = EventCache()
+        return _event_cache
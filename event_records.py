@@ -0,0 +1,62 @@
+"""Compact, parse-once event records shared by CalendarGUI and CalendarNote.
+
+API event resources are large nested dicts whose start/end strings every
+consumer used to re-parse. An EventRecord is built once, when the events
+arrive (from Google or from the local cache), and keeps only what the apps
+read: epoch start/end, the "Home"/"Office" ignored flag, an interned
+summary and the attendee emails the notes export needs.
+"""
+import sys
+from datetime import datetime
+import pytz
+import instrumentation
+
+IGNORED_TITLES = frozenset(["Office", "Home"])
+DEFAULT_TIMEZONE = 'America/Halifax'  # All-day events start at midnight here
+
+
+def event_timestamp(event_time):
+    if 'dateTime' in event_time:
+        return datetime.fromisoformat(event_time['dateTime']).timestamp()
+    elif 'date' in event_time:
+        local_timezone = pytz.timezone(DEFAULT_TIMEZONE)
+        return local_timezone.localize(datetime.fromisoformat(event_time['date'] + 'T00:00:00')).timestamp()
+    raise ValueError("Invalid event time format")
+
+
+class EventRecord:
+    __slots__ = ('event_id', 'start', 'end', 'all_day', 'ignored', 'summary', 'attendees')
+
+    def __init__(self, event_id, start, end, all_day=False, summary='', attendees=()):
+        self.event_id = event_id
+        self.start = start  # Epoch seconds
+        self.end = end
+        self.all_day = all_day
+        self.summary = sys.intern(summary)
+        self.ignored = self.summary in IGNORED_TITLES
+        self.attendees = tuple(attendees)
+
+    @classmethod
+    def from_api(cls, event):
+        start = event['start']
+        return cls(
+            event.get('id'),
+            event_timestamp(start),
+            event_timestamp(event['end']),
+            all_day='dateTime' not in start,
+            summary=event.get('summary', ''),
+            attendees=[a.get('email', '') for a in event.get('attendees', [])])
+
+    def start_datetime(self, timezone=None):
+        return datetime.fromtimestamp(self.start, timezone or pytz.timezone(DEFAULT_TIMEZONE))
+
+    def end_datetime(self, timezone=None):
+        return datetime.fromtimestamp(self.end, timezone or pytz.timezone(DEFAULT_TIMEZONE))
+
+    def __repr__(self):
+        return f"EventRecord({self.event_id!r}, {self.summary!r}, {self.start}, {self.end})"
+
+
+def records_from_api(events):
+    with instrumentation.span("parse", events=len(events)):
+        return [EventRecord.from_api(event) for event in events]
@@ -0,0 +1,211 @@
+"""In-memory stand-in for the Google Calendar v3 service used by the apps.
+
+Only the calls the apps make are implemented (events().list, including
+incremental syncToken listings, and freebusy().query), with the same request
+arguments and response shapes, so the availability code can be exercised
+offline:
+
+    service = FakeCalendarService({'me@example.com': [event, ...]})
+    availability.get_common_free_slots(['me@example.com', 'you@example.com'], service=service)
+
+latency (seconds) is slept on every execute(), to imitate the round trip to
+Google when timing code that fetches. fields= partial-response masks are
+applied like the real API, so code that reads a field its mask leaves out
+fails here too. page_size caps every page, even when maxResults asks for more.
+"""
+import threading
+import time
+from datetime import datetime
+import pytz
+
+DEFAULT_PAGE_SIZE = 250
+
+
+def parse_event_time(event_time, timezone='America/Halifax'):
+    if 'dateTime' in event_time:
+        return datetime.fromisoformat(event_time['dateTime'])
+    elif 'date' in event_time:
+        return pytz.timezone(timezone).localize(datetime.fromisoformat(event_time['date'] + 'T00:00:00'))
+    raise ValueError("Invalid event time format")
+
+
+def format_utc(dt):
+    return dt.astimezone(pytz.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def parse_fields_mask(fields):
+    """Parse a mask like "nextPageToken,items(id,attendees/email)" into {'nextPageToken': None, 'items': {...}}.
+
+    None means the whole value is kept.
+    """
+    mask, _ = _parse_selectors(fields, 0)
+    return mask
+
+
+def _parse_selectors(fields, position):
+    mask = {}
+    while position < len(fields) and fields[position] != ')':
+        end = position
+        while end < len(fields) and fields[end] not in ',()':
+            end += 1
+        path = fields[position:end].strip().split('/')
+        submask = None
+        if end < len(fields) and fields[end] == '(':
+            submask, end = _parse_selectors(fields, end + 1)
+            end += 1  # Past the closing parenthesis
+        node = mask
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        if path[-1] in node and node[path[-1]] is not None and submask is not None:
+            node[path[-1]].update(submask)
+        else:
+            node[path[-1]] = submask
+        position = end + 1 if end < len(fields) and fields[end] == ',' else end
+    return mask, position
+
+
+def apply_fields_mask(value, mask):
+    if mask is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields_mask(item, mask) for item in value]
+    if isinstance(value, dict):
+        return {key: apply_fields_mask(value[key], submask) for key, submask in mask.items() if key in value}
+    return value
+
+
+class FakeRequest:
+    def __init__(self, service, handler, fields=None):
+        self._service = service
+        self._handler = handler
+        self._fields = fields
+
+    def execute(self):
+        with self._service._count_lock:
+            self._service.request_count += 1
+        if self._service.latency:
+            time.sleep(self._service.latency)
+        response = self._handler()
+        if self._fields:
+            response = apply_fields_mask(response, parse_fields_mask(self._fields))
+        return response
+
+
+class FakeEventsResource:
+    def __init__(self, service):
+        self._service = service
+
+    def list(self, calendarId, timeMin=None, timeMax=None, singleEvents=False, orderBy=None,
+             pageToken=None, maxResults=None, syncToken=None, fields=None, **kwargs):
+        def handler():
+            if syncToken is not None:
+                events = self._service.changed_events(calendarId, int(syncToken))
+            else:
+                events = self._service.list_events(calendarId, timeMin, timeMax)
+            if orderBy == 'startTime':
+                events.sort(key=lambda e: parse_event_time(e['start']))
+            page_size = min(maxResults or self._service.page_size, self._service.page_size)
+            offset = int(pageToken) if pageToken else 0
+            response = {'kind': 'calendar#events', 'items': events[offset:offset + page_size]}
+            if offset + page_size < len(events):
+                response['nextPageToken'] = str(offset + page_size)
+            elif orderBy is None:
+                # Like the real API, only unordered listings hand out a token for the next incremental sync
+                response['nextSyncToken'] = str(self._service.version)
+            return response
+        return FakeRequest(self._service, handler, fields)
+
+
+class FakeFreeBusyResource:
+    def __init__(self, service):
+        self._service = service
+
+    def query(self, body, fields=None):
+        def handler():
+            calendars = {}
+            for item in body.get('items', []):
+                calendar_id = item['id']
+                if calendar_id not in self._service.calendars:
+                    calendars[calendar_id] = {'busy': [], 'errors': [{'domain': 'global', 'reason': 'notFound'}]}
+                    continue
+                calendars[calendar_id] = {
+                    'busy': self._service.busy_intervals(calendar_id, body['timeMin'], body['timeMax'])}
+            return {
+                'kind': 'calendar#freeBusy',
+                'timeMin': body['timeMin'],
+                'timeMax': body['timeMax'],
+                'calendars': calendars,
+            }
+        return FakeRequest(self._service, handler, fields)
+
+
+class FakeCalendarService:
+    """Serves events from a {calendar_id: [event, ...]} dict of API-shaped event resources."""
+
+    def __init__(self, calendars=None, page_size=DEFAULT_PAGE_SIZE, latency=0.0):
+        self.calendars = calendars if calendars is not None else {}
+        self.page_size = page_size
+        self.latency = latency
+        self.request_count = 0
+        self._count_lock = threading.Lock()  # The fetch pool executes requests from several threads
+        self.version = 0
+        self._changes = []  # (version, calendar_id, event) in the order they happened
+
+    def upsert_event(self, calendar_id, event):
+        events = self.calendars.setdefault(calendar_id, [])
+        events[:] = [e for e in events if e.get('id') != event['id']]
+        events.append(event)
+        self._record_change(calendar_id, event)
+
+    def delete_event(self, calendar_id, event_id):
+        events = self.calendars.get(calendar_id, [])
+        events[:] = [e for e in events if e.get('id') != event_id]
+        self._record_change(calendar_id, {'kind': 'calendar#event', 'id': event_id, 'status': 'cancelled'})
+
+    def _record_change(self, calendar_id, event):
+        self.version += 1
+        self._changes.append((self.version, calendar_id, event))
+
+    def changed_events(self, calendar_id, since_version):
+        latest = {}
+        for version, changed_calendar_id, event in self._changes:
+            if version > since_version and changed_calendar_id == calendar_id:
+                latest[event['id']] = event
+        return list(latest.values())
+
+    def events(self):
+        return FakeEventsResource(self)
+
+    def freebusy(self):
+        return FakeFreeBusyResource(self)
+
+    def list_events(self, calendar_id, time_min_iso=None, time_max_iso=None):
+        time_min = datetime.fromisoformat(time_min_iso) if time_min_iso else None
+        time_max = datetime.fromisoformat(time_max_iso) if time_max_iso else None
+        events = []
+        for event in self.calendars.get(calendar_id, []):
+            if event.get('status') == 'cancelled':
+                continue
+            if time_min and parse_event_time(event['end']) <= time_min:
+                continue
+            if time_max and parse_event_time(event['start']) >= time_max:
+                continue
+            events.append(event)
+        return events
+
+    def busy_intervals(self, calendar_id, time_min_iso, time_max_iso):
+        # Transparent ("show me as available") events do not block time, like the real endpoint
+        time_min = datetime.fromisoformat(time_min_iso)
+        time_max = datetime.fromisoformat(time_max_iso)
+        intervals = sorted(
+            (max(parse_event_time(e['start']), time_min), min(parse_event_time(e['end']), time_max))
+            for e in self.list_events(calendar_id, time_min_iso, time_max_iso)
+            if e.get('transparency') != 'transparent')
+
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return [{'start': format_utc(start), 'end': format_utc(end)} for start, end in merged]
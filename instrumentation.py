@@ -0,0 +1,172 @@
+"""Optional timing and API-call instrumentation for both apps.
+
+Off unless the app is started with --diagnostics or CALENDAR_DIAGNOSTICS=1;
+when off, span() and count() do nothing and API requests run untouched.
+When on, every span (auth, client build, API round trips, parsing, widget
+rebuilds) and counter (API calls, response bytes, cache hits) is kept in
+memory for the Diagnostics window and appended as one JSON object per line
+to ~/.calendar_app/diagnostics.jsonl.
+
+--profile (or CALENDAR_PROFILE=1) additionally runs the session under
+cProfile (Tk thread only) and tracemalloc and writes <app>.pstats and
+<app>-memory.txt to the app directory on exit. It implies --diagnostics.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+import calendar_service  # Module import: calendar_service imports this module too
+
+DIAGNOSTICS_FLAG = "--diagnostics"
+PROFILE_FLAG = "--profile"
+MEMORY_TOP_LINES = 25
+
+PROFILING = PROFILE_FLAG in sys.argv or os.environ.get('CALENDAR_PROFILE') == '1'
+ENABLED = PROFILING or DIAGNOSTICS_FLAG in sys.argv or os.environ.get('CALENDAR_DIAGNOSTICS') == '1'
+
+_lock = threading.Lock()
+_spans = {}     # name -> [count, total seconds, max seconds]
+_counters = {}  # name -> value
+_log_file = None
+_disabled_span = nullcontext()
+
+
+def get_log_path():
+    return os.path.join(calendar_service.get_app_dir(), "diagnostics.jsonl")
+
+
+def _log(record):
+    global _log_file
+    if _log_file is None:
+        _log_file = open(get_log_path(), 'a', encoding='utf-8', buffering=1)
+    _log_file.write(json.dumps(record) + "\n")
+
+
+def span(name, **fields):
+    """Time the body of a with-block under name; fields are added to its log line."""
+    if not ENABLED:
+        return _disabled_span
+    return _span(name, fields)
+
+
+@contextmanager
+def _span(name, fields):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        with _lock:
+            totals = _spans.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+            _log(dict(fields, span=name, ms=round(seconds * 1000, 3), thread=threading.current_thread().name,
+                      at=time.time()))
+
+
+def count(name, amount=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def execute(request, api_name):
+    """request.execute(), counted and timed as api_name, with the size of the response it returned."""
+    if not ENABLED:
+        return request.execute()
+    with span(f"api.{api_name}"):
+        response = request.execute()
+    count(f"api.{api_name}.calls")
+    # The client has already decoded the body, so this is the size of the JSON, not of the gzip on the wire
+    count("api.response_bytes", len(json.dumps(response)))
+    return response
+
+
+def summary():
+    """Return {'spans': {name: {...}}, 'counters': {...}, 'cache_hit_rates': {...}} for everything recorded so far."""
+    with _lock:
+        spans = {name: {'count': n, 'total_ms': round(total * 1000, 1), 'mean_ms': round(total * 1000 / n, 2),
+                        'max_ms': round(longest * 1000, 1)}
+                 for name, (n, total, longest) in sorted(_spans.items())}
+        counters = dict(sorted(_counters.items()))
+    hit_rates = {}
+    for name in counters:
+        if name.endswith('.hit'):
+            cache = name[:-len('.hit')]
+            lookups = counters[name] + counters.get(cache + '.miss', 0)
+            hit_rates[cache] = round(counters[name] / lookups, 3)
+    return {'spans': spans, 'counters': counters, 'cache_hit_rates': hit_rates}
+
+
+def format_summary():
+    report = summary()
+    lines = ["Spans (count, total ms, mean ms, max ms):"]
+    for name, stats in report['spans'].items():
+        lines.append(f"  {name:32} {stats['count']:6} {stats['total_ms']:10.1f} {stats['mean_ms']:9.2f} {stats['max_ms']:9.1f}")
+    lines.append("")
+    lines.append("Counters:")
+    for name, value in report['counters'].items():
+        lines.append(f"  {name:32} {value:>12,}")
+    lines.append("")
+    lines.append("Cache hit rates:")
+    for name, rate in report['cache_hit_rates'].items():
+        lines.append(f"  {name:32} {rate:11.1%}")
+    lines.append("")
+    lines.append(f"Log: {get_log_path()}")
+    return "\n".join(lines)
+
+
+def show_diagnostics_window(root):
+    import tkinter as tk
+    from tkinter import ttk
+
+    window = tk.Toplevel(root)
+    window.title("Diagnostics")
+    window.geometry("560x420")
+
+    text = tk.Text(window, wrap=tk.NONE, font=('Courier', 10))
+    text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+
+    def refresh():
+        text.delete(1.0, tk.END)
+        text.insert(tk.END, format_summary())
+
+    ttk.Button(window, text="Refresh", command=refresh).pack(pady=10)
+    refresh()
+
+
+def add_diagnostics_button(root, parent):
+    """Add a Diagnostics button to parent when instrumentation is on; otherwise do nothing."""
+    if ENABLED:
+        from tkinter import ttk
+        ttk.Button(parent, text="Diagnostics", command=lambda: show_diagnostics_window(root)).pack(pady=5)
+
+
+def start_profiling(app_name):
+    """Run the rest of the session under cProfile and tracemalloc if --profile was given."""
+    if not PROFILING:
+        return
+    import cProfile
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+
+    def write_profiles():
+        profiler.disable()
+        profiler.dump_stats(os.path.join(calendar_service.get_app_dir(), f"{app_name}.pstats"))
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with open(os.path.join(calendar_service.get_app_dir(), f"{app_name}-memory.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"current {current:,} bytes, peak {peak:,} bytes\n\n")
+            for stat in snapshot.statistics('lineno')[:MEMORY_TOP_LINES]:
+                f.write(f"{stat}\n")
+        tracemalloc.stop()
+
+    atexit.register(write_profiles)
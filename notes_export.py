@@ -0,0 +1,134 @@
+"""Streaming export of saved meeting notes.
+
+One generator reads the notes of a date range from the notes store a batch
+at a time, and a writer formats each row straight onto its output:
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        export_notes(iter_export_rows(start_date, end_date), CsvWriter(f))
+
+Nothing holds the whole export in memory, so a quarter of notes costs the
+same memory as a day. The clipboard is the exception: pyperclip needs the
+full text, so ClipboardWriter collects it before copying.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+import pytz
+from notes_store import get_notes_store
+
+DEFAULT_TIMEZONE = 'America/Halifax'
+SEPARATOR = "--------------------------------------------\n\n"
+
+
+def format_start(row, timezone=None):
+    if row.start is None:
+        return 'N/A'
+    return datetime.fromtimestamp(row.start, timezone or pytz.timezone(DEFAULT_TIMEZONE)).strftime('%Y-%m-%d %H:%M')
+
+
+def iter_export_rows(start_date, end_date, store=None):
+    """Yield the NoteRows of every saved note from start_date to end_date (inclusive)."""
+    return (store or get_notes_store()).iter_notes(start_date, end_date)
+
+
+class CsvWriter:
+    def __init__(self, file):
+        self.writer = csv.writer(file)
+        self.writer.writerow(["Event Start Time", "Event Name", "Attendees", "Notes"])
+
+    def write(self, row):
+        self.writer.writerow([format_start(row), row.summary, '; '.join(row.attendees), row.notes])
+
+    def close(self):
+        pass
+
+
+class TextWriter:
+    def __init__(self, file, title="Event Notes"):
+        self.file = file
+        self.file.write(f"{title}\n\n")
+
+    def write(self, row):
+        self.file.write(f"Event Start Time: {format_start(row)}\n"
+                        f"Event Name: {row.summary}\n"
+                        f"Attendees: {'; '.join(row.attendees)}\n"
+                        f"Notes:\n{row.notes}\n\n"
+                        f"{SEPARATOR}")
+
+    def close(self):
+        pass
+
+
+class JsonLinesWriter:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, row):
+        self.file.write(json.dumps({
+            'event_id': row.event_id,
+            'date': row.event_date,
+            'start': format_start(row) if row.start is not None else None,
+            'summary': row.summary,
+            'attendees': list(row.attendees),
+            'notes': row.notes,
+        }) + "\n")
+
+    def close(self):
+        pass
+
+
+class ClipboardWriter(TextWriter):
+    """The TXT layout, copied to the clipboard when closed."""
+
+    def __init__(self, title="Current Event Notes"):
+        super().__init__(io.StringIO(), title)
+
+    def close(self):
+        import pyperclip
+        pyperclip.copy(self.file.getvalue())
+
+
+# Format name -> (file extension, writer class)
+FILE_FORMATS = {
+    "CSV": (".csv", CsvWriter),
+    "TXT": (".txt", TextWriter),
+    "JSONL": (".jsonl", JsonLinesWriter),
+}
+
+
+def export_notes(rows, writer):
+    """Write every row with writer, close it, and return how many rows were written."""
+    written = 0
+    for row in rows:
+        writer.write(row)
+        written += 1
+    writer.close()
+    return written
+
+
+def export_to_file(path, file_format, start_date, end_date, store=None):
+    """Stream the range's notes to path in file_format and return the number of notes written.
+
+    The file is written beside path and moved into place at the end, so an
+    interrupted export never leaves a half-written file; nothing is created
+    when the range has no notes.
+    """
+    writer_class = FILE_FORMATS[file_format][1]
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+        written = export_notes(iter_export_rows(start_date, end_date, store), writer_class(f))
+    if written:
+        os.replace(temp_path, path)
+    else:
+        os.remove(temp_path)
+    return written
+
+
+def get_export_filename(file_format, start_date, end_date):
+    extension = FILE_FORMATS[file_format][0]
+    date_str = start_date.strftime('%Y_%m_%d')
+    if end_date != start_date:
+        date_str += f"_to_{end_date.strftime('%Y_%m_%d')}"
+    return f"event_notes_{date_str}{extension}"
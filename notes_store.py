@@ -0,0 +1,253 @@
+"""Durable store for CalendarNote's meeting notes.
+
+Notes live in ~/.calendar_app/notes.sqlite3, one row per (event id, date),
+next to the event's title, start and attendees so they can be exported or
+searched without the event being on screen. Every save is a single-row
+UPSERT committed with synchronous=FULL, so an edit that has been saved
+survives a crash or power cut, and a day's notes load with one indexed
+query when it is reopened.
+
+Notes, titles and attendees are also kept in an SQLite FTS5 index that
+triggers update with every save, so search() answers "notes mentioning X
+with attendee Y" from the index without reading the notes themselves. On a
+Python whose SQLite lacks FTS5, search() falls back to a table scan.
+
+Unlike the event cache this is user data: a schema change must migrate the
+rows, never drop them.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from calendar_service import get_app_dir
+
+SCHEMA_VERSION = 2
+ITER_BATCH_SIZE = 200
+SEARCH_LIMIT = 100
+SNIPPET_TOKENS = 12
+
+# start is an EventRecord-style epoch timestamp, or None if the event was never seen
+NoteRow = namedtuple('NoteRow', ['event_id', 'event_date', 'start', 'summary', 'attendees', 'notes'])
+# A search match: the NoteRow and a short excerpt of its notes with the matched words in [brackets]
+SearchHit = namedtuple('SearchHit', ['row', 'snippet'])
+
+# id is an explicit INTEGER PRIMARY KEY so the search index can point at rows by a rowid VACUUM never changes
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    event_id TEXT NOT NULL,
+    event_date TEXT NOT NULL,
+    notes TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    start_ts REAL,
+    attendees TEXT NOT NULL DEFAULT '',
+    updated_at REAL NOT NULL,
+    UNIQUE (event_id, event_date)
+);
+CREATE INDEX IF NOT EXISTS notes_by_date ON notes (event_date, start_ts);
+"""
+
+# Version 1 keyed notes by (event_id, event_date) alone
+MIGRATE_FROM_V1 = """
+ALTER TABLE notes RENAME TO notes_v1;
+DROP INDEX IF EXISTS notes_by_date;
+""" + SCHEMA + """
+INSERT INTO notes (event_id, event_date, notes, summary, start_ts, attendees, updated_at)
+    SELECT event_id, event_date, notes, summary, start_ts, attendees, updated_at FROM notes_v1;
+DROP TABLE notes_v1;
+"""
+
+# An external-content index over notes: it stores only the index, and the triggers keep it in step
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE notes_fts USING fts5(notes, summary, attendees, content='notes', content_rowid='id');
+CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts (rowid, notes, summary, attendees) VALUES (new.id, new.notes, new.summary, new.attendees);
+END;
+CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, notes, summary, attendees)
+        VALUES ('delete', old.id, old.notes, old.summary, old.attendees);
+END;
+CREATE TRIGGER notes_fts_update AFTER UPDATE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, notes, summary, attendees)
+        VALUES ('delete', old.id, old.notes, old.summary, old.attendees);
+    INSERT INTO notes_fts (rowid, notes, summary, attendees) VALUES (new.id, new.notes, new.summary, new.attendees);
+END;
+INSERT INTO notes_fts (notes_fts) VALUES ('rebuild');
+"""
+
+
+def get_notes_path():
+    return os.path.join(get_app_dir(), "notes.sqlite3")
+
+
+class NotesStore:
+    """Notes keyed by (event_id, event_date), where event_date is a datetime.date."""
+
+    def __init__(self, path=None):
+        self.path = path or get_notes_path()
+        # Saves come from the Tk thread and reads may come from workers, so one
+        # connection is shared behind a lock; every write is a single small row
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        if self.path != ':memory:':
+            self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=FULL')
+        with self._lock:
+            self._migrate()
+            self.has_search_index = self._create_search_index()
+
+    def _migrate(self):
+        connection = self._connection
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        # executescript commits as it goes, so the whole upgrade is one explicit transaction
+        if version == 1:
+            connection.executescript('BEGIN;' + MIGRATE_FROM_V1 + f'PRAGMA user_version = {SCHEMA_VERSION}; COMMIT;')
+        else:
+            connection.executescript('BEGIN;' + SCHEMA + f'PRAGMA user_version = {SCHEMA_VERSION}; COMMIT;')
+
+    def _create_search_index(self):
+        """Create and fill the FTS5 index if it is missing; return False if this SQLite has no FTS5."""
+        connection = self._connection
+        if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'notes_fts'").fetchone():
+            return True
+        try:
+            connection.executescript('BEGIN;' + SEARCH_SCHEMA + 'COMMIT;')
+        except sqlite3.OperationalError:
+            # "no such module: fts5"
+            connection.rollback()
+            return False
+        return True
+
+    def save(self, event_id, event_date, notes, record=None):
+        """Store the notes for one event on one day; empty notes delete the row.
+
+        record (an EventRecord) supplies the title, start and attendees kept with the notes.
+        Without a record (a note opened from search results), the details already stored are kept.
+        """
+        with self._lock, self._connection:
+            if not notes:
+                self._connection.execute('DELETE FROM notes WHERE event_id = ? AND event_date = ?',
+                                         (event_id, event_date.isoformat()))
+                return
+            if record:
+                update = ('notes = excluded.notes, summary = excluded.summary, start_ts = excluded.start_ts, '
+                          'attendees = excluded.attendees, updated_at = excluded.updated_at')
+            else:
+                update = 'notes = excluded.notes, updated_at = excluded.updated_at'
+            self._connection.execute(
+                'INSERT INTO notes (event_id, event_date, notes, summary, start_ts, attendees, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                f'ON CONFLICT (event_id, event_date) DO UPDATE SET {update}',
+                (event_id, event_date.isoformat(), notes,
+                 record.summary if record else '', record.start if record else None,
+                 '\n'.join(record.attendees) if record else '', time.time()))
+
+    def get(self, event_id, event_date):
+        with self._lock:
+            row = self._connection.execute('SELECT notes FROM notes WHERE event_id = ? AND event_date = ?',
+                                           (event_id, event_date.isoformat())).fetchone()
+        return row[0] if row else ""
+
+    def notes_for_date(self, event_date):
+        """Return {event_id: notes} for every event with notes on event_date."""
+        with self._lock:
+            rows = self._connection.execute('SELECT event_id, notes FROM notes WHERE event_date = ? ORDER BY start_ts',
+                                            (event_date.isoformat(),)).fetchall()
+        return dict(rows)
+
+    def iter_notes(self, start_date, end_date):
+        """Yield a NoteRow for every note from start_date to end_date (inclusive), by day and start time.
+
+        Rows are read in batches from their own connection, so memory stays
+        flat however long the range is and saves are not blocked meanwhile.
+        """
+        query = ('SELECT event_id, event_date, start_ts, summary, attendees, notes FROM notes '
+                 'WHERE event_date BETWEEN ? AND ? ORDER BY event_date, start_ts, event_id')
+        params = (start_date.isoformat(), end_date.isoformat())
+        if self.path == ':memory:':
+            # The in-memory database only exists on the shared connection
+            with self._lock:
+                rows = self._connection.execute(query, params).fetchall()
+            for row in rows:
+                yield self._note_row(row)
+            return
+
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = connection.execute(query, params)
+            while True:
+                batch = cursor.fetchmany(ITER_BATCH_SIZE)
+                if not batch:
+                    break
+                for row in batch:
+                    yield self._note_row(row)
+        finally:
+            connection.close()
+
+    def search(self, text='', attendee='', limit=SEARCH_LIMIT):
+        """Return up to limit SearchHits whose notes or title contain every word of text
+        and whose attendees include attendee, best matches first.
+
+        Words match as prefixes, so "budg" finds "budget"; attendee may be a whole
+        address or the start of one.
+        """
+        words = text.split()
+        attendee = attendee.strip()
+        if not words and not attendee:
+            return []
+        if not self.has_search_index:
+            return self._scan(words, attendee, limit)
+
+        terms = [f'{{notes summary}} : {_fts_phrase(word)}*' for word in words]
+        if attendee:
+            terms.append(f'attendees : {_fts_phrase(attendee)}*')
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT n.event_id, n.event_date, n.start_ts, n.summary, n.attendees, n.notes, '
+                f"snippet(notes_fts, 0, '[', ']', '...', {SNIPPET_TOKENS}) "
+                'FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid '
+                'WHERE notes_fts MATCH ? ORDER BY rank, n.event_date DESC LIMIT ?',
+                (' AND '.join(terms), limit)).fetchall()
+        return [SearchHit(self._note_row(row[:6]), row[6]) for row in rows]
+
+    def _scan(self, words, attendee, limit):
+        conditions = ['(notes LIKE ? OR summary LIKE ?)'] * len(words)
+        params = [f'%{word}%' for word in words for _ in range(2)]
+        if attendee:
+            conditions.append('attendees LIKE ?')
+            params.append(f'%{attendee}%')
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT event_id, event_date, start_ts, summary, attendees, notes FROM notes '
+                f'WHERE {" AND ".join(conditions)} ORDER BY event_date DESC LIMIT ?', params + [limit]).fetchall()
+        return [SearchHit(self._note_row(row), row[5][:80]) for row in rows]
+
+    @staticmethod
+    def _note_row(row):
+        event_id, event_date, start_ts, summary, attendees, notes = row
+        return NoteRow(event_id, event_date, start_ts, summary, tuple(attendees.split('\n')) if attendees else (), notes)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _fts_phrase(text):
+    """Quote text as an FTS5 string, so punctuation in it is never read as query syntax."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+_notes_store = None
+_notes_store_lock = threading.Lock()
+
+
+def get_notes_store():
+    """Return the process-wide store backed by ~/.calendar_app/notes.sqlite3."""
+    global _notes_store
+    with _notes_store_lock:
+        if _notes_store is None:
+            _notes_store = NotesStore()
+        return _notes_store
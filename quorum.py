@@ -0,0 +1,96 @@
+"""Quorum scheduling: slots where at least k of n calendars are free.
+
+Each day is swept once over the open intervals of every calendar (the
+output of availability.get_week_open_slots), splitting the day into segments
+within which the same people are free. Who is free is an int bitset with
+one bit per calendar, so "free for the whole slot" is the AND of the masks
+of the segments a slot covers and "how many" is a popcount; the cost grows
+with the number of open intervals, not with calendars times minutes, and
+stays small for dozens of calendars over several weeks.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+SLOT_STEP_MINUTES = 15
+
+# free and missing are tuples of calendar ids, in the order the calendars were given
+QuorumSlot = namedtuple('QuorumSlot', ['start', 'end', 'free', 'missing'])
+
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+
+def get_day_segments(open_slots_by_calendar, day_index, window):
+    """Return [(start, end, mask)] covering window, where bit i of mask is set while calendar i is open."""
+    window_start, window_end = window
+    added = {}
+    removed = {}
+    for bit, open_slots_by_day in enumerate(open_slots_by_calendar.values()):
+        for start, end in open_slots_by_day[day_index]:
+            start, end = max(start, window_start), min(end, window_end)
+            if start < end:
+                added[start] = added.get(start, 0) | (1 << bit)
+                removed[end] = removed.get(end, 0) | (1 << bit)
+
+    segments = []
+    mask = 0
+    segment_start = window_start
+    for boundary in sorted(set(added) | set(removed) | {window_end}):
+        if boundary > segment_start:
+            segments.append((segment_start, boundary, mask))
+            segment_start = boundary
+        # A calendar's intervals never overlap, so a bit that ends here can only restart here
+        mask = (mask & ~removed.get(boundary, 0)) | added.get(boundary, 0)
+    return segments
+
+
+def iter_quorum_masks(open_slots_by_calendar, day_windows, duration_minutes, min_free, step_minutes=SLOT_STEP_MINUTES):
+    """Yield (start, end, mask) for every slot on the step grid where at least min_free calendars are free, in time order."""
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    for day_index, window in enumerate(day_windows):
+        segments = get_day_segments(open_slots_by_calendar, day_index, window)
+        first = 0  # First segment that ends after the current start; only ever moves forward
+        start = window[0].replace(second=0, microsecond=0)
+        start += timedelta(minutes=-start.minute % step_minutes)
+        if start < window[0]:
+            start += step
+        while start + duration <= window[1]:
+            end = start + duration
+            while segments[first][1] <= start:
+                first += 1
+            mask = -1
+            index = first
+            while index < len(segments) and segments[index][0] < end:
+                mask &= segments[index][2]
+                index += 1
+            if popcount(mask) >= min_free:
+                yield start, end, mask
+            start += step
+
+
+def rank_quorum_slots(open_slots_by_calendar, day_windows, duration_minutes, min_free, required=(), count=5):
+    """Return up to count QuorumSlots with at least min_free calendars free, best first.
+
+    Slots are ranked by how many required calendars are free, then by how
+    many calendars are free in all, then earliest first; a slot overlapping
+    one already picked is skipped, so the suggestions are distinct times.
+    """
+    calendar_ids = list(open_slots_by_calendar)
+    required_mask = 0
+    for calendar_id in required:
+        required_mask |= 1 << calendar_ids.index(calendar_id)
+
+    candidates = sorted(iter_quorum_masks(open_slots_by_calendar, day_windows, duration_minutes, min_free),
+                        key=lambda slot: (-popcount(slot[2] & required_mask), -popcount(slot[2]), slot[0]))
+    picked = []
+    for start, end, mask in candidates:
+        if any(start < other.end and other.start < end for other in picked):
+            continue
+        free = tuple(calendar_id for bit, calendar_id in enumerate(calendar_ids) if mask >> bit & 1)
+        missing = tuple(calendar_id for bit, calendar_id in enumerate(calendar_ids) if not mask >> bit & 1)
+        picked.append(QuorumSlot(start, end, free, missing))
+        if len(picked) == count:
+            break
+    return picked
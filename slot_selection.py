@@ -0,0 +1,118 @@
+"""Pick which candidate meeting slots to suggest.
+
+Slot generation in availability is lazy: candidates stream out one at a time
+as Slot tuples and a selector consumes them, keeping only what it needs.
+Nothing holds every candidate of a long horizon in memory, and FirstNSelector
+stops generation as soon as it has enough.
+"""
+import heapq
+import itertools
+import random
+import zlib
+from collections import namedtuple
+import pytz
+
+DEFAULT_SLOT_COUNT = 5
+
+# free_before/free_after: whole minutes of open time around the slot before the
+# nearest meeting or edge of the working day
+Slot = namedtuple('Slot', ['start', 'end', 'free_before', 'free_after'])
+
+
+class FirstNSelector:
+    """The earliest slots, stopping the generator once count are found."""
+
+    def __init__(self, count=DEFAULT_SLOT_COUNT):
+        self.count = count
+
+    def select(self, slots):
+        return list(itertools.islice(slots, self.count))
+
+
+class RandomSelector:
+    """A uniform random sample of count slots by reservoir sampling.
+
+    With a seed the same candidates always give the same picks.
+    """
+
+    def __init__(self, count=DEFAULT_SLOT_COUNT, seed=None):
+        self.count = count
+        self.seed = seed
+
+    def select(self, slots):
+        rng = random.Random(self.seed)
+        reservoir = []
+        for seen, slot in enumerate(slots):
+            if seen < self.count:
+                reservoir.append(slot)
+            else:
+                replace_at = rng.randrange(seen + 1)
+                if replace_at < self.count:
+                    reservoir[replace_at] = slot
+        return sorted(reservoir)
+
+
+class TopKSelector:
+    """The count best slots by score, spread so no day gets more than max_per_day
+    while other days still have candidates.
+
+    Keeps a bounded heap per day, so memory grows with the number of days in
+    the horizon, not the number of candidates.
+    """
+
+    def __init__(self, count=DEFAULT_SLOT_COUNT, score=None, max_per_day=None, timezone='America/Halifax'):
+        self.count = count
+        self.score = score or make_slot_score(timezone=timezone)
+        self.max_per_day = max_per_day or count
+        self.timezone = pytz.timezone(timezone)
+
+    def select(self, slots):
+        heaps_by_day = {}
+        for order, slot in enumerate(slots):
+            day = slot.start.astimezone(self.timezone).date()
+            heap = heaps_by_day.setdefault(day, [])
+            # order breaks ties in favour of earlier slots and keeps Slots out of comparisons
+            entry = (self.score(slot), -order, day, slot)
+            if len(heap) < self.count:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        chosen = []
+        overflow = []
+        picked_per_day = {}
+        for entry in sorted(itertools.chain.from_iterable(heaps_by_day.values()), reverse=True):
+            day = entry[2]
+            if picked_per_day.get(day, 0) < self.max_per_day:
+                picked_per_day[day] = picked_per_day.get(day, 0) + 1
+                chosen.append(entry)
+                if len(chosen) == self.count:
+                    break
+            else:
+                overflow.append(entry)
+        chosen.extend(overflow[:self.count - len(chosen)])
+        return sorted(entry[3] for entry in chosen)
+
+
+def make_slot_score(preferred_hours=(10, 15), timezone='America/Halifax', buffer_cap_minutes=60):
+    """Score slots starting inside preferred_hours first, then by breathing room around them."""
+    local_timezone = pytz.timezone(timezone)
+
+    def score(slot):
+        in_preferred_hours = preferred_hours[0] <= slot.start.astimezone(local_timezone).hour < preferred_hours[1]
+        buffer_minutes = min(slot.free_before, slot.free_after, buffer_cap_minutes)
+        return (buffer_cap_minutes + 1) * in_preferred_hours + buffer_minutes
+
+    return score
+
+
+def stable_seed(*parts):
+    # hash() of a str changes between runs, so derive seeds from a checksum instead
+    return zlib.crc32(repr(parts).encode('utf-8'))
+
+
+SELECTORS = {
+    "Random": lambda seed: RandomSelector(seed=seed),
+    "Best Fit": lambda seed: TopKSelector(max_per_day=1),
+    "Earliest": lambda seed: FirstNSelector(),
+}
@@ -0,0 +1,79 @@
+"""Per-calendar working hours.
+
+Availability is only offered inside everyone's working hours. Hours default
+to 11:00-17:00 Halifax time, Monday to Friday, and can be set per calendar
+in ~/.calendar_app/working_hours.json:
+
+    {
+        "default": {"timezone": "America/Halifax", "start": "11:00", "end": "17:00", "days": [0, 1, 2, 3, 4]},
+        "someone@example.com": {"timezone": "America/Los_Angeles", "start": "09:00", "end": "17:00"}
+    }
+
+Days are numbered like datetime.weekday() (Monday is 0). Keys missing from
+an entry fall back to the default entry.
+"""
+import json
+import os
+import threading
+from functools import lru_cache
+from datetime import datetime, time
+import pytz
+from calendar_service import get_app_dir
+
+DEFAULT_WORKING_HOURS = {"timezone": "America/Halifax", "start": "11:00", "end": "17:00", "days": [0, 1, 2, 3, 4]}
+
+_working_hours = None
+_working_hours_lock = threading.Lock()
+
+
+def get_working_hours_path():
+    return os.path.join(get_app_dir(), "working_hours.json")
+
+
+def load_working_hours():
+    """Return the {calendar_id or 'default': hours} mapping, reading the file once per process."""
+    global _working_hours
+    with _working_hours_lock:
+        if _working_hours is None:
+            configured = {}
+            path = get_working_hours_path()
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    configured = json.load(f)
+            default = dict(DEFAULT_WORKING_HOURS, **configured.get('default', {}))
+            _working_hours = {key: dict(default, **hours) for key, hours in configured.items()}
+            _working_hours['default'] = default
+        return _working_hours
+
+
+def get_working_hours(calendar_id):
+    working_hours = load_working_hours()
+    return working_hours.get(calendar_id, working_hours['default'])
+
+
+@lru_cache(maxsize=8192)  # pytz localize is slow and the hours are read once per process anyway
+def get_working_window(calendar_id, day):
+    """Return calendar_id's (start, end) working window on the given date, or None on a day off."""
+    hours = get_working_hours(calendar_id)
+    if day.weekday() not in hours['days']:
+        return None
+    local_timezone = pytz.timezone(hours['timezone'])
+    start = local_timezone.localize(datetime.combine(day, time.fromisoformat(hours['start'])))
+    end = local_timezone.localize(datetime.combine(day, time.fromisoformat(hours['end'])))
+    return start, end
+
+
+def get_shared_window(calendar_ids, day):
+    """Return the part of the day every calendar is working, or None if there is none.
+
+    The window is expressed in the first calendar's time zone.
+    """
+    windows = [get_working_window(calendar_id, day) for calendar_id in calendar_ids or ['default']]
+    if any(window is None for window in windows):
+        return None
+    start = max(window[0] for window in windows)
+    end = min(window[1] for window in windows)
+    if start >= end:
+        return None
+    local_timezone = pytz.timezone(get_working_hours((calendar_ids or ['default'])[0])['timezone'])
+    return start.astimezone(local_timezone), end.astimezone(local_timezone)